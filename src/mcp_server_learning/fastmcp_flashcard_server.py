@@ -6,12 +6,28 @@ A modern, streamlined implementation of the flashcard MCP server using FastMCP's
 Pythonic patterns for reduced boilerplate and improved maintainability.
 """
 
+import atexit
+import functools
+import itertools
+import json
+import os
 import re
+import string
 import sys
-from typing import Any, Dict, List, Optional
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 from fastmcp import FastMCP
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
 
 # Initialize FastMCP instance
 mcp = FastMCP(
@@ -21,7 +37,8 @@ mcp = FastMCP(
 Use these tools when the user wants to:
 - Create flashcards from study material (create_cards)
 - Upload flashcards to their Anki deck (upload_cards)
-- Search, update, or delete existing Anki cards (search_notes, update_note, delete_notes)
+- Search, update, or delete existing Anki cards (search_notes, update_note, update_notes,
+  delete_notes)
 - Move cards between decks or sync with AnkiWeb (move_to_deck, sync)
 - Check Anki connectivity (check_connection)
 
@@ -45,19 +62,198 @@ FLASHCARD QUALITY RULES - follow these when generating card content:
 )
 
 
+def _response_body(response: requests.Response) -> bytes:
+    """Return the raw JSON body of an AnkiConnect response."""
+    content = getattr(response, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return bytes(content)
+    # Responses without raw content (e.g. test doubles) are re-encoded
+    return json.dumps(response.json()).encode()
+
+
+def _decode_body(body: bytes) -> Dict[str, Any]:
+    """Decode an AnkiConnect JSON body, using orjson when it is installed.
+
+    Large notesInfo payloads are dominated by JSON decoding, which orjson does
+    several times faster than the stdlib.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+# Read-only AnkiConnect actions whose results may be served from the short-lived
+# cache. Any other action (except requestPermission) is treated as a write and
+# invalidates the cache. Edits made in the Anki GUI are not seen by the cache, so
+# reads may be up to _READ_CACHE_TTL seconds stale.
+_CACHEABLE_ACTIONS = frozenset(
+    {"findNotes", "findCards", "notesInfo", "deckNames", "modelNames", "modelFieldNames"}
+)
+_NON_INVALIDATING_ACTIONS = _CACHEABLE_ACTIONS | {"requestPermission"}
+_CACHE_MISS = object()
+_READ_CACHE_TTL = 10.0
+
+
+def _env_batch_size(default: int = 50) -> int:
+    """Read MCP_ANKI_BATCH_SIZE, falling back to the default if unset or invalid."""
+    value = os.getenv("MCP_ANKI_BATCH_SIZE")
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"Ignoring invalid MCP_ANKI_BATCH_SIZE={value!r}; using {default}", file=sys.stderr)
+        return default
+
+
+# Bulk writes are chunked so a failure part-way through still preserves (and
+# reports) the batches that already went through.
+_ANKI_BATCH_SIZE = _env_batch_size()
+
+
+class AnkiConnectionError(Exception):
+    """Raised when AnkiConnect cannot be reached or does not answer in time."""
+
+
+class _TokenBucket:
+    """Token-bucket limiter pacing bulk writes to AnkiConnect's single-threaded server."""
+
+    def __init__(self, rate: float = 10.0, capacity: int = 5):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            time.sleep((1 - self._tokens) / self.rate)
+            self._tokens = 1.0
+            self._updated = time.monotonic()
+        self._tokens -= 1
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    """Split items into consecutive chunks of at most size elements."""
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class _TTLCache:
+    """Small LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = _READ_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _CACHE_MISS
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return _CACHE_MISS
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 class AnkiConnector:
     """Interface for connecting to Anki via AnkiConnect addon."""
 
-    def __init__(self, url: str = "http://localhost:8765", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        url: str = "http://localhost:8765",
+        api_key: Optional[str] = None,
+    ):
         self.url = url
         self.api_key = api_key
-        self.session = requests.Session()
+        self.session = self._create_session()
+        self._read_cache = _TTLCache()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_debug = bool(os.getenv("MCP_CACHE_DEBUG"))
+        self._write_limiter = _TokenBucket()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a keep-alive session with a small pooled, retrying adapter."""
+        session = requests.Session()
+        # This is the only retry layer. Retrying an AnkiConnect action is not safe
+        # in general: every call is a POST, and writes such as addNotes are not
+        # idempotent. Only connections that could not be established are retried,
+        # since the server never saw those requests. Requests it may have seen
+        # (read timeouts, reset connections, error statuses) are never replayed.
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, read=0, other=0, status=0, backoff_factor=0.2),
+        )
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        self.session.close()
 
     def _make_request(self, action: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make a request to AnkiConnect API."""
+        """Make a request to AnkiConnect API.
+
+        Read-only actions are answered from a short-lived cache; any write
+        action clears it so subsequent reads see fresh data. The cache keeps the
+        raw response body and decodes it on each hit, so every caller gets its
+        own objects and may mutate them freely.
+        """
         if params is None:
             params = {}
 
+        if action not in _CACHEABLE_ACTIONS:
+            if action not in _NON_INVALIDATING_ACTIONS:
+                self._read_cache.clear()
+            return self._send_request(action, params)
+
+        key = (action, json.dumps(params, sort_keys=True, default=str))
+        cached = self._read_cache.get(key)
+        if cached is not _CACHE_MISS:
+            self._cache_hits += 1
+            self._log_cache("hit", action)
+            return _decode_body(cached).get("result")
+
+        self._cache_misses += 1
+        self._log_cache("miss", action)
+        result, body = self._send_request_with_body(action, params)
+        self._read_cache.set(key, body)
+        return result
+
+    def _log_cache(self, outcome: str, action: str) -> None:
+        if self._cache_debug:
+            print(
+                f"AnkiConnect cache {outcome}: {action} "
+                f"(hits={self._cache_hits}, misses={self._cache_misses})",
+                file=sys.stderr,
+            )
+
+    def _send_request(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a single request to AnkiConnect, bypassing the read cache."""
+        return self._send_request_with_body(action, params)[0]
+
+    def _send_request_with_body(self, action: str, params: Dict[str, Any]) -> Tuple[Any, bytes]:
+        """Send a single request, returning its result and the raw JSON body."""
         payload = {"action": action, "version": 6, "params": params}
         if self.api_key:
             payload["key"] = self.api_key
@@ -65,25 +261,34 @@ class AnkiConnector:
         try:
             response = self.session.post(self.url, json=payload, timeout=10)
             response.raise_for_status()
-            result = response.json()
+            body = _response_body(response)
+            result = _decode_body(body)
 
             if result.get("error"):
                 # Match project test expectations
                 raise Exception(f"AnkiConnect error: {result['error']}")
 
-            return result.get("result")
+            return result.get("result"), body
 
         except requests.exceptions.ConnectionError:
             # Include expected substring for tests
-            raise Exception("Failed to connect to Anki: connection refused")
+            raise AnkiConnectionError("Failed to connect to Anki: connection refused")
         except requests.exceptions.Timeout:
             # Include expected substring for tests
-            raise Exception("Failed to connect to Anki: request timed out")
+            raise AnkiConnectionError("Failed to connect to Anki: request timed out")
         except Exception as e:
             if "Anki Connect API error" in str(e):
                 raise
             raise Exception(f"Request failed: {e}")
 
+    def _paced_write(self, action: str, params: Dict[str, Any]) -> Any:
+        """Send a bulk write once, paced by the write token bucket.
+
+        Refused connections are retried by the session adapter; nothing else is.
+        """
+        self._write_limiter.acquire()
+        return self._make_request(action, params)
+
     def check_permission(self) -> Dict[str, Any]:
         """Check if AnkiConnect is available and get permission info."""
         return self._make_request("requestPermission")
@@ -137,6 +342,9 @@ class AnkiConnector:
 
     def add_notes(self, notes: List[Dict[str, Any]]) -> List[Optional[int]]:
         """Add multiple notes to Anki."""
+        if not notes:
+            return []
+
         formatted_notes = []
         for note in notes:
             formatted_notes.append(
@@ -166,6 +374,10 @@ class AnkiConnector:
         """Find notes matching the given query."""
         return self._make_request("findNotes", {"query": query})
 
+    def find_cards(self, query: str) -> List[int]:
+        """Find card IDs matching the given query."""
+        return self._make_request("findCards", {"query": query})
+
     def notes_info(self, note_ids: List[int]) -> List[Dict[str, Any]]:
         """Get detailed information about specific notes."""
         return self._make_request("notesInfo", {"notes": note_ids})
@@ -204,10 +416,131 @@ class AnkiConnector:
             # Flag setting is enhancement, don't break note update
             pass
 
+    def _current_notes(self, note_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Fetch notesInfo straight from AnkiConnect (bypassing the read cache), by note ID."""
+        notes = self._send_request("notesInfo", {"notes": note_ids}) or []
+        return {
+            note["noteId"]: note for note in notes if isinstance(note, dict) and "noteId" in note
+        }
+
+    @staticmethod
+    def _note_has_content(
+        note: Optional[Dict[str, Any]], fields: Dict[str, str], tags: Optional[List[str]]
+    ) -> bool:
+        """Return whether a notesInfo entry already holds the given fields (and tags)."""
+        if not note:
+            return False
+        current = note.get("fields") or {}
+        for name, value in fields.items():
+            if not isinstance(current.get(name), dict) or current[name].get("value") != value:
+                return False
+        return tags is None or sorted(set(note.get("tags") or [])) == sorted(set(tags))
+
+    def update_notes(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Update several notes using batched AnkiConnect requests.
+
+        Updates are sent in chunks of ``MCP_ANKI_BATCH_SIZE`` notes, one multi
+        request per chunk. Each chunk first reads the notes' current content from
+        Anki, and updates that would not change a note are skipped. If a chunk
+        cannot be delivered, earlier chunks stay applied and the remaining updates
+        are reported with the error.
+
+        Args:
+            updates: List of {"note_id": int, "fields": dict, "tags": list|None}.
+
+        Returns:
+            One {"note_id": int, "changed": bool, "error": str|None} dict per update.
+        """
+        results: List[Dict[str, Any]] = []
+        written_ids: List[int] = []
+
+        for chunk in _chunks(updates, _ANKI_BATCH_SIZE):
+            chunk_results: List[Dict[str, Any]] = []
+            actions: List[Dict[str, Any]] = []
+            # (chunk result index, first action index, action count)
+            pending: List[Tuple[int, int, int]] = []
+
+            try:
+                current = self._current_notes([update["note_id"] for update in chunk])
+
+                for update in chunk:
+                    note_id = update["note_id"]
+                    fields = update.get("fields", {})
+                    tags = update.get("tags")
+                    chunk_results.append({"note_id": note_id, "changed": False, "error": None})
+
+                    if self._note_has_content(current.get(note_id), fields, tags):
+                        continue
+
+                    first_action = len(actions)
+                    actions.append(
+                        {
+                            "action": "updateNoteFields",
+                            "params": {"note": {"id": note_id, "fields": fields}},
+                        }
+                    )
+                    if tags is not None:
+                        actions.append(
+                            {"action": "updateNoteTags", "params": {"note": note_id, "tags": tags}}
+                        )
+                    pending.append(
+                        (len(chunk_results) - 1, first_action, len(actions) - first_action)
+                    )
+
+                if actions:
+                    responses = self._paced_write("multi", self._multi_params(actions))
+            except Exception as e:
+                for update in updates[len(results) :]:
+                    results.append(
+                        {"note_id": update["note_id"], "changed": False, "error": str(e)}
+                    )
+                break
+
+            for result_idx, first_action, count in pending:
+                result = chunk_results[result_idx]
+                errors = [
+                    r.get("error")
+                    for r in responses[first_action : first_action + count]
+                    if isinstance(r, dict) and r.get("error")
+                ]
+                if errors:
+                    result["error"] = errors[0]
+                    continue
+                result["changed"] = True
+                written_ids.append(result["note_id"])
+            results.extend(chunk_results)
+
+        # Auto-flag with purple (best-effort, don't fail if flagging errors)
+        try:
+            if written_ids:
+                card_ids = self.get_card_ids_from_notes(written_ids)
+                if card_ids:
+                    self._set_card_flags(card_ids)
+        except Exception:
+            # Flag setting is enhancement, don't break batch update
+            pass
+
+        return results
+
     def delete_notes(self, note_ids: List[int]) -> None:
         """Delete notes by their IDs."""
         self._make_request("deleteNotes", {"notes": note_ids})
 
+    def delete_notes_batched(self, note_ids: List[int]) -> Tuple[List[int], Optional[str]]:
+        """Delete notes in chunks of ``MCP_ANKI_BATCH_SIZE``, preserving partial progress.
+
+        Returns:
+            The IDs that were deleted and the error that stopped the run, if any.
+        """
+        deleted: List[int] = []
+        for chunk in _chunks(note_ids, _ANKI_BATCH_SIZE):
+            try:
+                self._paced_write("deleteNotes", {"notes": chunk})
+            except Exception as e:
+                return deleted, str(e)
+            deleted.extend(chunk)
+        return deleted, None
+
     def delete_decks(self, deck_names: List[str], cards_too: bool = True) -> None:
         """Delete decks and optionally their cards.
 
@@ -230,6 +563,52 @@ class AnkiConnector:
         """
         self._make_request("changeDeck", {"cards": card_ids, "deck": deck})
 
+    def move_notes_to_deck(self, note_ids: List[int], deck: str) -> List[int]:
+        """Move all cards belonging to the given notes to a deck.
+
+        Card IDs are resolved with a ``nid:`` findCards query, which returns a
+        flat ID list instead of full notesInfo payloads. AnkiConnect's ``multi``
+        action cannot feed that result into changeDeck, so the two requests run
+        back-to-back over the same keep-alive session.
+
+        Args:
+            note_ids: List of note IDs whose cards should be moved.
+            deck: Target deck name.
+
+        Returns:
+            List of card IDs that were moved (empty if the notes have no cards).
+        """
+        if not note_ids:
+            return []
+
+        card_ids = self.find_cards("nid:" + ",".join(map(str, note_ids)))
+        if card_ids:
+            self.change_deck(card_ids, deck)
+        return card_ids
+
+    def multi(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run several AnkiConnect actions in a single HTTP request.
+
+        Args:
+            actions: List of {"action": str, "params": dict} entries.
+
+        Returns:
+            One {"result": Any, "error": str|None} dict per action, in order.
+        """
+        if not actions:
+            return []
+        return self._make_request("multi", self._multi_params(actions))
+
+    @staticmethod
+    def _multi_params(actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the params of a multi request from {"action", "params"} entries."""
+        return {
+            "actions": [
+                {"action": a["action"], "params": a.get("params", {}), "version": 6}
+                for a in actions
+            ]
+        }
+
     def _set_card_flags(self, card_ids: List[int], flag: int = 7) -> None:
         """Set flags on cards (purple=7 by default).
 
@@ -246,6 +625,74 @@ class AnkiConnector:
         )
 
 
+# Precompiled LaTeX delimiter patterns. The bound ``sub`` methods are looked up
+# once here so the per-card conversion loops avoid repeated attribute lookups.
+_sub_anki_display = re.compile(r"\$\$([^$]+?)\$\$").sub
+_sub_anki_inline = re.compile(r"\$([^$\n]+?)\$").sub
+_sub_protect_display = re.compile(r"\\\[[\s\S]*?\\\]").sub
+_sub_paren_to_display = re.compile(r"\\\(([^)]*?)\\\)").sub
+_sub_dollars_to_display = re.compile(r"\$\$([\s\S]*?)\$\$").sub
+_sub_inline_to_display = re.compile(r"(?<!\$)\$([^\n$]+?)\$(?!\$)").sub
+
+_RE_QA = re.compile(r"Q:\s*(.*?)\s*A:\s*(.*?)(?=Q:|$)", re.DOTALL | re.IGNORECASE)
+
+# Single-pass card type detection: group 1 is a Q: marker, group 2 a cloze opener
+_RE_DETECT_CARD_TYPE = re.compile(r"(Q:)|(\{\{)", re.IGNORECASE)
+
+
+def _preserve_claude_latex(text: str) -> str:
+    """Keep standard LaTeX format for Claude Desktop (native LaTeX rendering)."""
+    if not text:
+        return text
+
+    # Claude Desktop supports standard LaTeX natively
+    # Just clean up any escaping issues
+    return text.replace("\\$", "$")  # Unescape dollar signs
+
+
+def _convert_to_anki_mathjax(text: str) -> str:
+    """Convert standard LaTeX to Anki MathJax format."""
+    if not text:
+        return text
+
+    # Convert standard LaTeX delimiters to Anki MathJax format
+    # $$display math$$ -> \[display math\]
+    result = _sub_anki_display(r"\\[\1\\]", text)
+
+    # $inline math$ -> \(inline math\)
+    return _sub_anki_inline(r"\\(\1\\)", result)
+
+
+def _convert_latex_to_display_format(text: str) -> str:
+    """Convert various LaTeX math delimiters to unified display format \\[...\\]."""
+    if not text:
+        return text
+
+    # Protect existing display math \[...\]
+    placeholders: list[str] = []
+
+    def _protect(match):
+        placeholders.append(match.group(0))
+        return f"__MJX_DISPLAY_{len(placeholders)-1}__"
+
+    s = _sub_protect_display(_protect, text)
+
+    # Convert \(...\) -> \[...\]
+    s = _sub_paren_to_display(r"\\[\1\\]", s)
+
+    # Convert $$...$$ -> \[...\]
+    s = _sub_dollars_to_display(r"\\[\1\\]", s)
+
+    # Convert inline $...$ -> \[...\] (avoid $$ handled above)
+    s = _sub_inline_to_display(r"\\[\1\\]", s)
+
+    # Restore protected \[...\]
+    for i, ph in enumerate(placeholders):
+        s = s.replace(f"__MJX_DISPLAY_{i}__", ph)
+
+    return s
+
+
 class FlashcardGenerator:
     """Generates flashcards from text with proper LaTeX math formatting.
 
@@ -264,30 +711,12 @@ class FlashcardGenerator:
     @staticmethod
     def preserve_claude_latex(text: str) -> str:
         """Keep standard LaTeX format for Claude Desktop (native LaTeX rendering)."""
-        if not text:
-            return text
-
-        # Claude Desktop supports standard LaTeX natively
-        # Just clean up any escaping issues
-        result = text.replace("\\$", "$")  # Unescape dollar signs
-        return result
+        return _preserve_claude_latex(text)
 
     @staticmethod
     def convert_to_anki_mathjax(text: str) -> str:
         """Convert standard LaTeX to Anki MathJax format."""
-        if not text:
-            return text
-
-        result = text
-
-        # Convert standard LaTeX delimiters to Anki MathJax format
-        # $$display math$$ -> \[display math\]
-        result = re.sub(r"\$\$([^$]+?)\$\$", r"\\[\1\\]", result)
-
-        # $inline math$ -> \(inline math\)
-        result = re.sub(r"\$([^$\n]+?)\$", r"\\(\1\\)", result)
-
-        return result
+        return _convert_to_anki_mathjax(text)
 
     @staticmethod
     def convert_latex_to_display_format(text: str) -> str:
@@ -298,34 +727,7 @@ class FlashcardGenerator:
         - \\(...\\) -> \\[...\\]
         - Existing \\[...\\] is preserved.
         """
-        if not text:
-            return text
-
-        s = text
-
-        # Protect existing display math \[...\]
-        placeholders: list[str] = []
-
-        def _protect(match):
-            placeholders.append(match.group(0))
-            return f"__MJX_DISPLAY_{len(placeholders)-1}__"
-
-        s = re.sub(r"\\\[[\s\S]*?\\\]", _protect, s)
-
-        # Convert \(...\) -> \[...\]
-        s = re.sub(r"\\\(([^)]*?)\\\)", r"\\[\1\\]", s)
-
-        # Convert $$...$$ -> \[...\]
-        s = re.sub(r"\$\$([\s\S]*?)\$\$", r"\\[\1\\]", s)
-
-        # Convert inline $...$ -> \[...\] (avoid $$ handled above)
-        s = re.sub(r"(?<!\$)\$([^\n$]+?)\$(?!\$)", r"\\[\1\\]", s)
-
-        # Restore protected \[...\]
-        for i, ph in enumerate(placeholders):
-            s = s.replace(f"__MJX_DISPLAY_{i}__", ph)
-
-        return s
+        return _convert_latex_to_display_format(text)
 
     @staticmethod
     def create_anki_cloze_card(text: str, cloze_markers: List[str] = None) -> str:
@@ -351,30 +753,45 @@ class FlashcardGenerator:
 
         return card_text
 
+    @staticmethod
+    def detect_card_type(text: str) -> str:
+        """Detect whether text is Q:/A: or cloze content from its first marker."""
+        match = _RE_DETECT_CARD_TYPE.search(text)
+        if match is not None and match.group(2):
+            return "cloze"
+        return "front-back"
+
+    @staticmethod
+    def card_type_of(card: Dict[str, str]) -> str:
+        """Return the type of a parsed card: "cloze" cards carry "text", others "front"."""
+        return "cloze" if "text" in card else "front-back"
+
     @staticmethod
     def parse_text_to_cards(text: str, card_type: str = "front-back") -> List[Dict[str, str]]:
-        """Parse text into multiple flashcards (preserves LaTeX for Claude Desktop)."""
+        """Parse text into multiple flashcards (preserves LaTeX for Claude Desktop).
+
+        Pass card_type="auto" to pick "front-back" or "cloze" from the content.
+        """
+        if card_type == "auto":
+            card_type = FlashcardGenerator.detect_card_type(text)
+
         cards = []
 
         if card_type == "front-back":
-            # First, try to find Q: A: patterns in the entire text (not split by newlines)
-            qa_matches = list(
-                re.finditer(
-                    r"Q:\s*(.*?)\s*A:\s*(.*?)(?=Q:|$)",
-                    text.strip(),
-                    re.DOTALL | re.IGNORECASE,
-                )
-            )
+            # First, try to find Q: A: patterns in the entire text (not split by newlines).
+            # Peek at the first match instead of materializing them all.
+            qa_iter = _RE_QA.finditer(text.strip())
+            first_match = next(qa_iter, None)
 
-            if qa_matches:
+            if first_match is not None:
                 # Process Q: A: patterns found
-                for qa_match in qa_matches:
+                for qa_match in itertools.chain((first_match,), qa_iter):
                     front = qa_match.group(1).strip()
                     back = qa_match.group(2).strip()
 
                     # Keep LaTeX as-is for Claude Desktop display
-                    front = FlashcardGenerator.preserve_claude_latex(front)
-                    back = FlashcardGenerator.preserve_claude_latex(back)
+                    front = _preserve_claude_latex(front)
+                    back = _preserve_claude_latex(back)
 
                     cards.append({"front": front, "back": back})
             else:
@@ -393,8 +810,8 @@ class FlashcardGenerator:
                         back = "\n".join(lines[1:]).strip()
 
                         # Keep LaTeX as-is for Claude Desktop display
-                        front = FlashcardGenerator.preserve_claude_latex(front)
-                        back = FlashcardGenerator.preserve_claude_latex(back)
+                        front = _preserve_claude_latex(front)
+                        back = _preserve_claude_latex(back)
 
                         cards.append({"front": front, "back": back})
 
@@ -410,7 +827,7 @@ class FlashcardGenerator:
                 try:
                     cloze_text = FlashcardGenerator.create_anki_cloze_card(section)
                     # Keep LaTeX as-is for Claude Desktop display
-                    cloze_text = FlashcardGenerator.preserve_claude_latex(cloze_text)
+                    cloze_text = _preserve_claude_latex(cloze_text)
                     cards.append({"text": cloze_text})
                 except ValueError:
                     # If no cloze markers found, skip this section
@@ -491,6 +908,10 @@ class AnkiCardManager:
         self, cards_data: List[Dict[str, Any]], deck_name: str
     ) -> Dict[str, Any]:
         """Upload multiple cards to Anki."""
+        # Nothing to upload: skip the permission/deck round-trips entirely
+        if not cards_data:
+            return {"success": False, "error": "No cards provided", "total_cards": 0}
+
         try:
             # Check connection and create deck if needed
             self.anki.check_permission()
@@ -545,9 +966,29 @@ class AnkiCardManager:
             }
 
 
+# Connectors handed out by get_anki_connector, tracked so their sessions can be
+# closed at exit (including ones already evicted from the LRU).
+_open_connectors: "weakref.WeakSet[AnkiConnector]" = weakref.WeakSet()
+
+
+def _close_connectors() -> None:
+    for connector in list(_open_connectors):
+        connector.close()
+
+
+atexit.register(_close_connectors)
+
+
+@functools.lru_cache(maxsize=8)
+def _connector_for_key(api_key: Optional[str]) -> AnkiConnector:
+    connector = AnkiConnector(api_key=api_key)
+    _open_connectors.add(connector)
+    return connector
+
+
 def get_anki_connector(api_key: Optional[str] = None) -> AnkiConnector:
-    """Get Anki connector instance."""
-    return AnkiConnector(api_key=api_key)
+    """Get Anki connector instance (memoized per API key, reusing its HTTP session)."""
+    return _connector_for_key(api_key)
 
 
 @mcp.tool
@@ -577,7 +1018,8 @@ def create_cards(
         content: Card content in Q:/A: format (front-back) or with {{cloze}} markers.
             Example front-back: "Q: Calculus: What is the derivative of $x^n$? A: $nx^{n-1}$ (power rule)"
             Example cloze: "The derivative of $x^n$ is ${{nx^{n-1}}}$ by the power rule"
-        card_type: "front-back" for Q&A pairs, "cloze" for fill-in-the-blank
+        card_type: "front-back" for Q&A pairs, "cloze" for fill-in-the-blank, or "auto"
+            to detect from the content
         title: Optional title for this card set
         tags: Optional tags for categorization
 
@@ -602,7 +1044,8 @@ def create_cards(
             "success": True,
             "data": {
                 "cards": cards,
-                "card_type": card_type,
+                # parse_text_to_cards resolves "auto"; report the type it chose
+                "card_type": FlashcardGenerator.card_type_of(cards[0]),
                 "title": title,
                 "tags": tags,
             },
@@ -646,7 +1089,8 @@ def upload_cards(
         content: Card content in Q:/A: format or with {{cloze}} markers.
             Example: "Q: Topology: What is a homeomorphism? A: A continuous bijection with continuous inverse"
         deck_name: Target Anki deck name (created if it doesn't exist)
-        card_type: "front-back" for Q&A pairs, "cloze" for fill-in-the-blank
+        card_type: "front-back" for Q&A pairs, "cloze" for fill-in-the-blank, or "auto"
+            to detect from the content
         tags: Tags for the cards (default: ["mcp-generated"])
         anki_api_key: AnkiConnect API key (only if authentication is configured)
 
@@ -663,10 +1107,10 @@ def upload_cards(
         # Convert LaTeX to Anki MathJax format for each card
         for card in cards:
             if "front" in card:
-                card["front"] = FlashcardGenerator.convert_to_anki_mathjax(card["front"])
-                card["back"] = FlashcardGenerator.convert_to_anki_mathjax(card["back"])
+                card["front"] = _convert_to_anki_mathjax(card["front"])
+                card["back"] = _convert_to_anki_mathjax(card["back"])
             elif "text" in card:
-                card["text"] = FlashcardGenerator.convert_to_anki_mathjax(card["text"])
+                card["text"] = _convert_to_anki_mathjax(card["text"])
 
         if not cards:
             return {
@@ -686,7 +1130,8 @@ def upload_cards(
             cards_data.append(
                 {
                     "data": card,
-                    "card_type": card_type,
+                    # Matches the Anki model to the parsed card, including for "auto"
+                    "card_type": FlashcardGenerator.card_type_of(card),
                     "tags": tags,
                 }
             )
@@ -814,6 +1259,14 @@ def search_notes(query: str, limit: int = 20, anki_api_key: Optional[str] = None
         }
 
 
+def _apply_note_updates(
+    updates: List[Dict[str, Any]], anki_api_key: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Apply note updates in one AnkiConnect round trip (shared by the update tools)."""
+    anki_connector = get_anki_connector(anki_api_key)
+    return anki_connector.update_notes(updates)
+
+
 @mcp.tool
 def update_note(
     note_id: int,
@@ -825,6 +1278,7 @@ def update_note(
     automatically re-flagged purple.
 
     To find a note_id, use search_notes first (e.g., search_notes("deck:MyDeck")).
+    To fix several notes at once, prefer update_notes.
 
     Args:
         note_id: Note ID from search_notes results
@@ -832,17 +1286,34 @@ def update_note(
         tags: Replace all tags on this note (omit to keep existing tags)
         anki_api_key: AnkiConnect API key (only if authentication is configured)
 
-    Returns {"success": bool, "data": {"note_id": int, "fields": dict, "tags": list},
-    "message": str, "error": str|null}.
+    If the note already holds these fields and tags, nothing is written
+    ("changed": false).
+
+    Returns {"success": bool, "data": {"note_id": int, "fields": dict, "tags": list,
+    "changed": bool}, "message": str, "error": str|null}.
     """
     try:
-        anki_connector = get_anki_connector(anki_api_key)
-        anki_connector.update_note(note_id, fields, tags)
+        (result,) = _apply_note_updates(
+            [{"note_id": note_id, "fields": fields, "tags": tags}], anki_api_key
+        )
+
+        if result["error"]:
+            return {
+                "success": False,
+                "data": None,
+                "message": f"Error updating note {note_id}",
+                "error": result["error"],
+            }
 
+        changed = result["changed"]
         return {
             "success": True,
-            "data": {"note_id": note_id, "fields": fields, "tags": tags},
-            "message": f"Successfully updated note {note_id}",
+            "data": {"note_id": note_id, "fields": fields, "tags": tags, "changed": changed},
+            "message": (
+                f"Successfully updated note {note_id}"
+                if changed
+                else f"Note {note_id} unchanged (already up to date)"
+            ),
             "error": None,
         }
 
@@ -855,6 +1326,53 @@ def update_note(
         }
 
 
+@mcp.tool
+def update_notes(
+    updates: List[Dict[str, Any]], anki_api_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """Update fields and/or tags on several Anki notes in one batched request.
+    Updated cards are automatically re-flagged purple.
+
+    Use this instead of repeated update_note calls when fixing multiple cards
+    (e.g., after review_deck).
+
+    Args:
+        updates: List of {"note_id": int, "fields": dict, "tags": [str] (optional)}.
+            Omit "tags" to keep a note's existing tags.
+        anki_api_key: AnkiConnect API key (only if authentication is configured)
+
+    Returns {"success": bool, "data": {"results": [{"note_id": int, "changed": bool,
+    "error": str|null}], "updated": int, "unchanged": int, "failed": int},
+    "message": str, "error": str|null}.
+    """
+    try:
+        results = _apply_note_updates(updates, anki_api_key)
+
+        failed = sum(1 for r in results if r["error"])
+        updated = sum(1 for r in results if r["changed"])
+        unchanged = len(results) - updated - failed
+
+        return {
+            "success": failed == 0,
+            "data": {
+                "results": results,
+                "updated": updated,
+                "unchanged": unchanged,
+                "failed": failed,
+            },
+            "message": f"Updated {updated} note(s), {unchanged} unchanged, {failed} failed",
+            "error": f"{failed} update(s) failed" if failed else None,
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "data": None,
+            "message": "Error updating notes",
+            "error": str(e),
+        }
+
+
 @mcp.tool
 def delete_notes(note_ids: List[int], anki_api_key: Optional[str] = None) -> Dict[str, Any]:
     """Permanently delete notes and their cards from Anki. This is destructive
@@ -867,16 +1385,29 @@ def delete_notes(note_ids: List[int], anki_api_key: Optional[str] = None) -> Dic
         anki_api_key: AnkiConnect API key (only if authentication is configured)
 
     Returns {"success": bool, "data": {"deleted_note_ids": [int], "count": int},
-    "message": str, "error": str|null}.
+    "message": str, "error": str|null}. If a batch fails part-way, data also lists
+    "failed_note_ids" and the already-deleted notes stay deleted.
     """
     try:
         anki_connector = get_anki_connector(anki_api_key)
-        anki_connector.delete_notes(note_ids)
+        deleted, error = anki_connector.delete_notes_batched(note_ids)
+
+        if error:
+            return {
+                "success": False,
+                "data": {
+                    "deleted_note_ids": deleted,
+                    "count": len(deleted),
+                    "failed_note_ids": note_ids[len(deleted) :],
+                },
+                "message": f"Deleted {len(deleted)} of {len(note_ids)} notes before failing",
+                "error": error,
+            }
 
         return {
             "success": True,
-            "data": {"deleted_note_ids": note_ids, "count": len(note_ids)},
-            "message": f"Successfully deleted {len(note_ids)} notes",
+            "data": {"deleted_note_ids": deleted, "count": len(deleted)},
+            "message": f"Successfully deleted {len(deleted)} notes",
             "error": None,
         }
 
@@ -939,11 +1470,8 @@ def move_to_deck(
     try:
         anki_connector = get_anki_connector(anki_api_key)
 
-        # Get card IDs from note IDs
-        notes_info = anki_connector.notes_info(note_ids)
-        card_ids = []
-        for note in notes_info:
-            card_ids.extend(note.get("cards", []))
+        # Resolve card IDs and move them in one connector call
+        card_ids = anki_connector.move_notes_to_deck(note_ids, deck_name)
 
         if not card_ids:
             return {
@@ -953,9 +1481,6 @@ def move_to_deck(
                 "error": "No cards to move",
             }
 
-        # Move cards to target deck
-        anki_connector.change_deck(card_ids, deck_name)
-
         return {
             "success": True,
             "data": {
@@ -975,13 +1500,12 @@ def move_to_deck(
         }
 
 
-@mcp.prompt
-def study_from_notes(note_names: str, deck_name: str = "Study Cards") -> str:
-    """Generate flashcards from Obsidian notes and upload to Anki."""
-    return f"""Help me study by creating flashcards from my Obsidian notes.
+# Prompt bodies are parsed once at import; rendered prompts are memoized per argument set.
+_STUDY_FROM_NOTES_PROMPT = string.Template(
+    """Help me study by creating flashcards from my Obsidian notes.
 
-Notes to process: {note_names}
-Target Anki deck: {deck_name}
+Notes to process: $note_names
+Target Anki deck: $deck_name
 
 Steps:
 1. Use obsidian_get_flashcard_content to extract key concepts from these notes
@@ -993,15 +1517,12 @@ Steps:
 4. If any cards contain math, verify expressions using math_verify_equivalence
 5. Show me the cards for review before uploading
 6. After I approve, upload to Anki using flashcard_upload_cards"""
+)
 
+_STUDY_FROM_PAPER_PROMPT = string.Template("""Help me study a paper from my Zotero library.
 
-@mcp.prompt
-def study_from_paper(item_key: str, deck_name: str = "Paper Notes") -> str:
-    """Generate flashcards from a Zotero paper and upload to Anki."""
-    return f"""Help me study a paper from my Zotero library.
-
-Zotero item key: {item_key}
-Target Anki deck: {deck_name}
+Zotero item key: $item_key
+Target Anki deck: $deck_name
 
 Steps:
 1. Use zotero_get_item to retrieve the paper details (title, abstract, etc.)
@@ -1013,16 +1534,12 @@ Steps:
    - Use cloze for formulas (blank one variable at a time)
    - Use front-back for conceptual understanding
 5. Show me the cards for review
-6. After approval, upload using flashcard_upload_cards"""
+6. After approval, upload using flashcard_upload_cards""")
 
-
-@mcp.prompt
-def review_deck(deck_name: str) -> str:
-    """Review an Anki deck for card quality issues."""
-    return f"""Review the flashcard quality in my Anki deck '{deck_name}'.
+_REVIEW_DECK_PROMPT = string.Template("""Review the flashcard quality in my Anki deck '$deck_name'.
 
 Steps:
-1. Use flashcard_search_notes with query 'deck:{deck_name}' to get all cards
+1. Use flashcard_search_notes with query 'deck:$deck_name' to get all cards
 2. Analyze each card against these quality criteria:
    - Is it atomic? (tests exactly one fact)
    - Is the front under 30 words? Is the back under 30 words?
@@ -1030,7 +1547,30 @@ Steps:
    - Does it have a topic prefix on the front?
    - Is the answer precise and unambiguous?
 3. Report: total cards, cards needing improvement, specific suggestions
-4. For cards that need fixes, offer to update them using flashcard_update_note"""
+4. For cards that need fixes, offer to update them in one call using flashcard_update_notes""")
+
+
+@functools.lru_cache(maxsize=64)
+def _render_prompt(template: string.Template, **fields: str) -> str:
+    return template.safe_substitute(**fields)
+
+
+@mcp.prompt
+def study_from_notes(note_names: str, deck_name: str = "Study Cards") -> str:
+    """Generate flashcards from Obsidian notes and upload to Anki."""
+    return _render_prompt(_STUDY_FROM_NOTES_PROMPT, note_names=note_names, deck_name=deck_name)
+
+
+@mcp.prompt
+def study_from_paper(item_key: str, deck_name: str = "Paper Notes") -> str:
+    """Generate flashcards from a Zotero paper and upload to Anki."""
+    return _render_prompt(_STUDY_FROM_PAPER_PROMPT, item_key=item_key, deck_name=deck_name)
+
+
+@mcp.prompt
+def review_deck(deck_name: str) -> str:
+    """Review an Anki deck for card quality issues."""
+    return _render_prompt(_REVIEW_DECK_PROMPT, deck_name=deck_name)
 
 
 def main():
@@ -6,17 +6,42 @@ Aggregates the flashcard, Zotero, Obsidian, and math verification servers
 into a single FastMCP endpoint with prefixed tool names.
 """
 
+import importlib
 import os
 import sys
-from typing import Any
+from typing import Any, Optional, Set
 
 from fastmcp import FastMCP
 
-from . import (
-    fastmcp_flashcard_server,
-    fastmcp_math_verification_server,
-    fastmcp_obsidian_server,
-    fastmcp_zotero_server,
+# Sub-server modules mounted into the suite, with the prefix applied to their tool
+# names. Modules are imported only when mounted, so disabled servers cost nothing.
+_SUB_SERVERS = (
+    ("fastmcp_flashcard_server", "flashcard"),
+    ("fastmcp_zotero_server", "zotero"),
+    ("fastmcp_obsidian_server", "obsidian"),
+    ("fastmcp_math_verification_server", "math"),
+)
+
+_SUITE_INSTRUCTIONS = sys.intern(
+    """This suite combines four learning tools under prefixed namespaces:
+
+- flashcard_*: Create, preview, and upload spaced-repetition flashcards to Anki
+- math_*: Verify mathematical expressions, derivatives, integrals, and proofs
+- obsidian_*: Read and search notes in an Obsidian vault
+- zotero_*: Search and manage references in a Zotero library
+
+Common learning workflows:
+1. Obsidian -> Flashcards: obsidian_get_flashcard_content -> flashcard_create_cards -> flashcard_upload_cards
+2. Zotero -> Flashcards: zotero_get_item + zotero_get_item_notes -> flashcard_create_cards -> flashcard_upload_cards
+3. Math verification: math_verify_derivative, math_verify_integral, math_verify_proof
+4. Deck review: flashcard_search_notes -> analyze quality -> flashcard_update_notes
+
+All tools return: {"success": bool, "data": Any, "message": str, "error": str|null}.
+Check "success" first; if false, check "error" for details.
+
+Flashcard quality rules: Each card tests ONE fact. Front: 5-20 words. Back: 1-15 words.
+No lists, no yes/no. Start fronts with topic prefix. Use cloze for formulas, Q&A for concepts.
+"""
 )
 
 
@@ -25,7 +50,19 @@ def _get_env(name: str, default: str) -> str:
     return value if value is not None and value != "" else default
 
 
+def _enabled_prefixes() -> Optional[Set[str]]:
+    """Prefixes listed in MCP_SUITE_ENABLE (e.g. "flashcard,math"), or None for all."""
+    value = _get_env("MCP_SUITE_ENABLE", "")
+    if not value:
+        return None
+    return {prefix.strip() for prefix in value.split(",") if prefix.strip()}
+
+
 def _mount_suite(suite: FastMCP) -> None:
+    # Mounting twice would register every sub-server's tools a second time
+    if getattr(suite, "_learning_suite_mounted", False):
+        return
+
     mount = getattr(suite, "mount", None)
     if mount is None:
         raise RuntimeError(
@@ -33,35 +70,20 @@ def _mount_suite(suite: FastMCP) -> None:
             " server composition."
         )
 
-    mount(fastmcp_flashcard_server.mcp, prefix="flashcard")
-    mount(fastmcp_zotero_server.mcp, prefix="zotero")
-    mount(fastmcp_obsidian_server.mcp, prefix="obsidian")
-    mount(fastmcp_math_verification_server.mcp, prefix="math")
+    # mount() only records the sub-server on the suite (tool schemas are built
+    # lazily on listing) and mutates shared state that FastMCP does not guard,
+    # so mounting stays sequential rather than fanned out to threads.
+    enabled = _enabled_prefixes()
+    for module_name, prefix in _SUB_SERVERS:
+        if enabled is not None and prefix not in enabled:
+            continue
+        server = importlib.import_module(f".{module_name}", __package__)
+        mount(server.mcp, prefix=prefix)
+    suite._learning_suite_mounted = True
 
 
 def build_suite() -> FastMCP:
-    suite = FastMCP(
-        "Learning MCP Suite",
-        instructions="""This suite combines four learning tools under prefixed namespaces:
-
-- flashcard_*: Create, preview, and upload spaced-repetition flashcards to Anki
-- math_*: Verify mathematical expressions, derivatives, integrals, and proofs
-- obsidian_*: Read and search notes in an Obsidian vault
-- zotero_*: Search and manage references in a Zotero library
-
-Common learning workflows:
-1. Obsidian -> Flashcards: obsidian_get_flashcard_content -> flashcard_create_cards -> flashcard_upload_cards
-2. Zotero -> Flashcards: zotero_get_item + zotero_get_item_notes -> flashcard_create_cards -> flashcard_upload_cards
-3. Math verification: math_verify_derivative, math_verify_integral, math_verify_proof
-4. Deck review: flashcard_search_notes -> analyze quality -> flashcard_update_note
-
-All tools return: {"success": bool, "data": Any, "message": str, "error": str|null}.
-Check "success" first; if false, check "error" for details.
-
-Flashcard quality rules: Each card tests ONE fact. Front: 5-20 words. Back: 1-15 words.
-No lists, no yes/no. Start fronts with topic prefix. Use cloze for formulas, Q&A for concepts.
-""",
-    )
+    suite = FastMCP("Learning MCP Suite", instructions=_SUITE_INSTRUCTIONS)
     _mount_suite(suite)
     return suite
 
@@ -6,37 +6,60 @@ A server for verifying mathematical expressions and multi-step proofs using SymP
 Focused on calculus, analysis, and linear algebra with LaTeX input support.
 """
 
+import atexit
+import cmath
+import functools
+import hashlib
+import json
+import linecache
+import multiprocessing
+import os
 import re
+import signal
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import sympy as sp
 from fastmcp import FastMCP
 from sympy import (
-    E,
     Expr,
-    I,
     Matrix,
     Symbol,
     cancel,
-    cos,
     diff,
-    exp,
     expand,
     factor,
     integrate,
     limit,
-    log,
-    oo,
-    pi,
-    series,
     simplify,
-    sin,
-    sqrt,
     symbols,
-    tan,
+    trigsimp,
 )
-from sympy.parsing.latex import parse_latex
+from sympy.core import cache as sympy_cache
+from sympy.functions.elementary.trigonometric import TrigonometricFunction
+from sympy.printing.str import StrPrinter
+
+# LaTeX backends are imported on first parse: sympy's parser pulls in the ANTLR
+# runtime, which the server does not need until a LaTeX string arrives.
+_latex_parsers: Optional[Tuple[Any, Any]] = None
+
+
+def _get_latex_parsers() -> Tuple[Any, Any]:
+    """Return (latex2sympy or None, sympy parse_latex), importing them once."""
+    global _latex_parsers
+    if _latex_parsers is None:
+        try:
+            from latex2sympy2 import latex2sympy
+        except ImportError:
+            latex2sympy = None
+        from sympy.parsing.latex import parse_latex
+
+        _latex_parsers = (latex2sympy, parse_latex)
+    return _latex_parsers
+
 
 # Initialize FastMCP instance
 mcp = FastMCP(
@@ -49,6 +72,7 @@ Use these tools when the user wants to:
 - Check if a mathematical identity holds (check_identity)
 - Validate a multi-step proof (verify_proof)
 - Simplify an expression with steps (simplify_expression)
+- Free memory held by parse/computation caches on a long-running server (clear_caches)
 
 All inputs accept LaTeX format (e.g., "\\frac{d}{dx}(x^2)", "\\int x dx").
 All tools return: {"success": bool, "data": Any, "message": str, "error": str|null}.
@@ -59,6 +83,159 @@ constants of integration are handled by comparing derivatives.
 )
 
 
+# Display/inline math delimiters stripped before parsing
+_RE_DELIMITERS = re.compile(r"^\s*(?:\\\[|\$\$?)|(?:\\\]|\$\$?)\s*$")
+
+# Bare function names; the lookbehind leaves existing LaTeX commands alone
+_RE_BARE_FUNCTION = re.compile(r"(?<!\\)\b(sin|cos|tan|log|exp|sqrt)\b")
+
+_FUNCTION_COMMANDS = {
+    "sin": r"\sin",
+    "cos": r"\cos",
+    "tan": r"\tan",
+    "log": r"\ln",  # Assume natural log
+    "exp": r"\exp",
+    "sqrt": r"\sqrt",
+}
+
+# Variable named in a proof-step justification, e.g. "differentiate with respect to t"
+_RE_WITH_RESPECT_TO = re.compile(r"with respect to (\w+)")
+
+# Calculus keywords in a proof-step justification, found in one scan
+_RE_CALCULUS_KEYWORD = re.compile(r"derivative|differentiate|integrate|integral", re.IGNORECASE)
+
+
+# Assumption of the form "x is real"
+_RE_ASSUMPTION = re.compile(r"(\w+)\s+is\s+(\w+)")
+
+
+# LaTeX -> srepr parse results persisted across server restarts, keyed by the
+# SHA-1 of the cleaned LaTeX string
+_PARSE_CACHE_PATH = (
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "mcp-learning"
+    / "latex-parse.json"
+)
+_PARSE_CACHE_MAX_ENTRIES = 4096
+_parse_disk_cache: Optional[Dict[str, str]] = None
+_parse_disk_cache_dirty = False
+
+
+def _parse_cache_tag() -> str:
+    """Identify the SymPy version and LaTeX backend that produced cached results."""
+    latex2sympy, _ = _get_latex_parsers()
+    backend = "latex2sympy2" if latex2sympy is not None else "parse_latex"
+    return f"sympy-{sp.__version__}-{backend}"
+
+
+def _load_parse_cache() -> Dict[str, str]:
+    """Load persisted parse results (once per process)."""
+    global _parse_disk_cache
+    if _parse_disk_cache is None:
+        _parse_disk_cache = {}
+        try:
+            with open(_PARSE_CACHE_PATH, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("tag") == _parse_cache_tag():
+                _parse_disk_cache = dict(stored["entries"])
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            pass
+        atexit.register(_save_parse_cache)
+    return _parse_disk_cache
+
+
+def _save_parse_cache() -> None:
+    """Persist parse results so a restarted server starts warm."""
+    if not _parse_disk_cache_dirty or not _parse_disk_cache:
+        return
+    # Dicts keep insertion order, so this keeps the most recently added entries
+    entries = dict(list(_parse_disk_cache.items())[-_PARSE_CACHE_MAX_ENTRIES:])
+    try:
+        _PARSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename: proof worker processes may save concurrently
+        tmp_path = _PARSE_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"tag": _parse_cache_tag(), "entries": entries}, f)
+        os.replace(tmp_path, _PARSE_CACHE_PATH)
+    except OSError as e:
+        print(f"Failed to save LaTeX parse cache: {e}", file=sys.stderr)
+
+
+def _from_srepr(serialized: str) -> Union[Expr, Matrix]:
+    """Rebuild a parse result from its srepr without re-evaluating it.
+
+    The LaTeX backends return unevaluated trees (e.g. y**2 * 7**-1); evaluating on
+    load would hand callers a differently shaped expression than a fresh parse.
+    """
+    with sp.evaluate(False):
+        return sp.sympify(serialized)
+
+
+def _parse_uncached(latex_expr: str) -> Union[Expr, Matrix]:
+    """Parse a cleaned LaTeX string with latex2sympy2, falling back to SymPy."""
+    latex2sympy, parse_latex = _get_latex_parsers()
+
+    # Try latex2sympy2 first as it's more robust for function notation; any
+    # failure there just means falling back to SymPy's parser
+    if latex2sympy is not None:
+        try:
+            return latex2sympy(latex_expr)
+        except Exception:
+            pass
+
+    # Fallback to SymPy's LaTeX parser
+    try:
+        return parse_latex(latex_expr)
+    except Exception as e:
+        raise ValueError(f"Error parsing LaTeX: Failed to parse LaTeX expression: {str(e)}")
+
+
+def _clean_latex(latex_expr: str) -> str:
+    """Normalize LaTeX input: strip delimiters and extra whitespace, spell functions as commands."""
+    if not isinstance(latex_expr, str):
+        raise ValueError(f"Error parsing LaTeX: expected a string, got {type(latex_expr).__name__}")
+
+    # Remove math delimiters, then trim and collapse whitespace so spacing
+    # variants of one expression share a cache entry
+    latex_expr = " ".join(_RE_DELIMITERS.sub("", latex_expr).split())
+
+    # Preprocess to ensure proper LaTeX function notation
+    latex_expr = _RE_BARE_FUNCTION.sub(lambda m: _FUNCTION_COMMANDS[m.group(1)], latex_expr)
+
+    return latex_expr
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_cached(latex_expr: str) -> Union[Expr, Matrix]:
+    """Parse a cleaned LaTeX string into SymPy; results are cached per string.
+
+    Keying on the cleaned string lets "$x^2$" and "x^2" share one entry.
+    """
+    global _parse_disk_cache_dirty
+
+    disk_cache = _load_parse_cache()
+    key = hashlib.sha1(latex_expr.encode("utf-8")).hexdigest()
+    stored = disk_cache.get(key)
+    if stored is not None:
+        try:
+            return _from_srepr(stored)
+        except (sp.SympifyError, SyntaxError, TypeError, ValueError):
+            disk_cache.pop(key, None)
+
+    result = _parse_uncached(latex_expr)
+
+    # Only persist results that survive the srepr round trip unchanged
+    try:
+        serialized = sp.srepr(result)
+        if sp.srepr(_from_srepr(serialized)) == serialized:
+            disk_cache[key] = serialized
+            _parse_disk_cache_dirty = True
+    except Exception:
+        pass
+
+    return result
+
+
 class LaTeXParser:
     """Parser for converting LaTeX mathematical expressions to SymPy objects."""
 
@@ -79,51 +256,11 @@ class LaTeXParser:
         Raises:
             ValueError: If parsing fails
         """
-        try:
-            # Clean up the LaTeX expression
-            latex_expr = latex_expr.strip()
-
-            # Remove display math delimiters if present
-            latex_expr = re.sub(r"^\\\[|\\\]$", "", latex_expr)
-            latex_expr = re.sub(r"^\$\$|\$\$$", "", latex_expr)
-            latex_expr = re.sub(r"^\$|\$$", "", latex_expr)
-
-            # Preprocess to ensure proper LaTeX function notation
-            # Replace common function names with LaTeX commands if not already present
-            function_replacements = {
-                r"\bsin\b": r"\\sin",
-                r"\bcos\b": r"\\cos",
-                r"\btan\b": r"\\tan",
-                r"\blog\b": r"\\ln",  # Assume natural log
-                r"\bexp\b": r"\\exp",
-                r"\bsqrt\b": r"\\sqrt",
-            }
-
-            for pattern, replacement in function_replacements.items():
-                # Only replace if not already a LaTeX command
-                if not re.search(replacement, latex_expr):
-                    latex_expr = re.sub(pattern, replacement, latex_expr)
-
-            # Try latex2sympy2 first as it's more robust for function notation
-            try:
-                from latex2sympy2 import latex2sympy
-
-                result = latex2sympy(latex_expr)
-                return result
-            except ImportError:
-                pass
-            except Exception:
-                pass
-
-            # Fallback to SymPy's LaTeX parser
-            try:
-                result = parse_latex(latex_expr)
-                return result
-            except Exception as e:
-                raise ValueError(f"Failed to parse LaTeX expression: {str(e)}")
-
-        except Exception as e:
-            raise ValueError(f"Error parsing LaTeX: {str(e)}")
+        result = _parse_cached(_clean_latex(latex_expr))
+        # Matrices are mutable; hand out a copy so callers cannot alter the cache
+        if isinstance(result, sp.MatrixBase):
+            return result.copy()
+        return result
 
     @staticmethod
     def parse_with_context(
@@ -143,20 +280,317 @@ class LaTeXParser:
 
         expr = LaTeXParser.parse(latex_expr)
 
+        # Names of the symbols that actually occur in the expression
+        names = {sym.name for sym in getattr(expr, "free_symbols", set())}
+
         # Parse assumptions
         symbol_assumptions = {}
         for assumption in assumptions:
             # Simple pattern matching for common assumptions
             # e.g., "x is real", "n is positive", "x > 0"
-            match = re.match(r"(\w+)\s+is\s+(\w+)", assumption)
+            match = _RE_ASSUMPTION.match(assumption)
             if match:
                 var_name, property_name = match.groups()
-                if var_name in str(expr):
+                if var_name in names:
                     symbol_assumptions[var_name] = property_name
 
         return expr, symbol_assumptions
 
 
+@functools.lru_cache(maxsize=256)
+def _sym(name: str, **assumptions: bool) -> Symbol:
+    """Return the SymPy symbol for a variable name, memoized per name and assumptions."""
+    return symbols(name, **assumptions)
+
+
+# A single printer instance; str() would build a new StrPrinter for every call
+_STR_PRINTER = StrPrinter()
+
+
+@functools.lru_cache(maxsize=2048)
+def _print_cached(expr: sp.Basic) -> str:
+    return _STR_PRINTER.doprint(expr)
+
+
+def _to_str(value: Any) -> str:
+    """Render a SymPy object (or plain value) as str() would.
+
+    Expressions are immutable, so their printed form is memoized; the same
+    expression typically fills several result fields across repeated checks.
+    """
+    if isinstance(value, sp.Basic):
+        return _print_cached(value)
+    return str(value)
+
+
+def _sympy_cached(func):
+    """Memoize a SymPy operation on its (hashable) expression arguments.
+
+    SymPy expressions are immutable and hashable, so they key the cache
+    directly. Unhashable arguments such as mutable matrices bypass it.
+    """
+    cached = functools.lru_cache(maxsize=1024)(func)
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        try:
+            hash(args)
+        except TypeError:
+            return func(*args)
+        return cached(*args)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+def _env_number(name: str, default, cast=float):
+    """Read a numeric setting from the environment, falling back to the default if invalid."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"Ignoring invalid {name}={value!r}; using {default}", file=sys.stderr)
+        return default
+
+
+# Wall-clock budget for a single simplify call (0 disables it); user LaTeX can
+# make simplify run for minutes
+_SIMPLIFY_TIMEOUT = _env_number("MCP_SIMPLIFY_TIMEOUT", 5.0)
+
+
+class SimplifyTimeoutError(Exception):
+    """Raised when simplify does not finish within the time budget."""
+
+
+def _bounded_simplify(expr, seconds: float = None):
+    """Run simplify, interrupting it with SIGALRM after ``seconds``.
+
+    Signals are only delivered to the main thread, so elsewhere (and on platforms
+    without SIGALRM) simplify runs unbounded.
+    """
+    if seconds is None:
+        seconds = _SIMPLIFY_TIMEOUT
+    if (
+        seconds <= 0
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+        # Never replace an outer timer, e.g. a nested call
+        or signal.getitimer(signal.ITIMER_REAL)[0] > 0
+    ):
+        return simplify(expr)
+
+    def on_alarm(signum, frame):
+        raise SimplifyTimeoutError(f"simplification timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return simplify(expr)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@_sympy_cached
+def _csimplify(expr):
+    # Timeouts raise, so they are never cached as results
+    return _bounded_simplify(expr)
+
+
+@_sympy_cached
+def _cexpand(expr):
+    return expand(expr)
+
+
+@_sympy_cached
+def _cfactor(expr):
+    return factor(expr)
+
+
+@_sympy_cached
+def _ccancel(expr):
+    return cancel(expr)
+
+
+@_sympy_cached
+def _ctrigsimp(expr):
+    return trigsimp(expr)
+
+
+@_sympy_cached
+def _clambdify(expr, var):
+    """Compile an expression into a plain-float function of one variable.
+
+    Evaluating the compiled function is far cheaper than subs + evalf per test
+    value. Its generated source is dropped from linecache, which lambdify would
+    otherwise grow by one entry per compiled expression.
+    """
+    func = sp.lambdify(var, expr, modules="math")
+    linecache.cache.pop(func.__code__.co_filename, None)
+    return func
+
+
+@_sympy_cached
+def _cdiff(expr, var):
+    return diff(expr, var)
+
+
+@_sympy_cached
+def _cintegrate(expr, var, lim=None):
+    if lim is not None:
+        return integrate(expr, (var, lim[0], lim[1]))
+    return integrate(expr, var)
+
+
+def _rational_polynomial(expr: Expr) -> Optional[sp.Poly]:
+    """Return ``expr`` as a Poly in its symbols if it has rational coefficients, else None."""
+    generators = expr.free_symbols
+    if not generators or not expr.is_polynomial(*generators):
+        return None
+    try:
+        poly = sp.Poly(expr, *sorted(generators, key=str))
+    except sp.PolynomialError:
+        return None
+    return poly if poly.domain.is_ZZ or poly.domain.is_QQ else None
+
+
+# Generic sample values for probing a difference; chosen to avoid 0, 1 and the
+# special angles where distinct expressions often coincide. Each further symbol
+# is offset by _PROBE_STEP so that e.g. x - y is not probed at x == y.
+_PROBE_VALUES = (sp.Rational(7, 10), sp.Rational(13, 9))
+_PROBE_STEP = sp.Rational(3, 11)
+
+
+def _is_numerically_nonzero(expr: Expr) -> bool:
+    """Return True when ``expr`` evaluates clearly away from zero at a sample point.
+
+    A nonzero value at any point proves the expression is not identically zero,
+    sparing the simplify call for non-identities. Symbols restricted to integers
+    or rationals are not probed, since identities may hold only on those values.
+    """
+    symbols_ = sorted(expr.free_symbols, key=str)
+    if any(s.is_integer or s.is_rational for s in symbols_):
+        return False
+    for value in _PROBE_VALUES:
+        try:
+            point = {s: value + i * _PROBE_STEP for i, s in enumerate(symbols_)}
+            sample = complex(expr.xreplace(point).evalf(30))
+        except (TypeError, ValueError, ZeroDivisionError):
+            continue
+        if cmath.isfinite(sample) and abs(sample) > 1e-8:
+            return True
+    return False
+
+
+def _reduce_difference(difference):
+    """Reduce a difference for an equality check, trying cheap tests before simplify.
+
+    Returns ``S.Zero`` when the difference is trivially zero, is known to be zero
+    from assumptions, or expands, cancels or trig-simplifies to zero; otherwise
+    the expanded difference of polynomials, the difference itself when it is
+    visibly nonzero at a sample point, or the simplified difference.
+    """
+    if difference == 0 or getattr(difference, "is_zero", None) is True:
+        return sp.S.Zero
+    # Rational constants, e.g. unevaluated sums of integer powers, reduce exactly
+    if getattr(difference, "is_number", False):
+        evaluated = difference.doit()
+        if evaluated.is_Rational:
+            return evaluated
+    expanded = _cexpand(difference)
+    if expanded == 0:
+        return sp.S.Zero
+    if isinstance(difference, Expr):
+        # A rational-coefficient polynomial is decided by its canonical Poly form,
+        # which also collapses unevaluated sums such as Add(-x, x) left by the parser
+        poly = _rational_polynomial(expanded)
+        if poly is not None:
+            return sp.S.Zero if poly.is_zero else expanded
+        if _is_numerically_nonzero(difference):
+            return difference
+        if _ccancel(difference) == 0:
+            return sp.S.Zero
+        if difference.has(TrigonometricFunction) and _ctrigsimp(difference) == 0:
+            return sp.S.Zero
+    return _csimplify(difference)
+
+
+def _has_denominator(expr: Any) -> bool:
+    """Return whether an expression contains a power with a negative exponent."""
+    if not isinstance(expr, Expr):
+        return False
+    return any(power.exp.is_negative for power in expr.atoms(sp.Pow))
+
+
+def _numbers_match(computed: Any, expected: Any) -> Optional[bool]:
+    """Compare two inexact constant results within floating-point tolerance.
+
+    Returns None unless both sides are finite numbers containing a Float, so exact
+    values (integers, rationals, pi, ...) are always decided by the symbolic check.
+    """
+    if isinstance(computed, (int, float)):
+        computed = sp.sympify(computed)
+    if isinstance(expected, (int, float)):
+        expected = sp.sympify(expected)
+    if not (getattr(computed, "is_number", False) and getattr(expected, "is_number", False)):
+        return None
+    # Identical values match outright; this also covers oo == oo, whose difference is nan
+    if computed == expected:
+        return True
+    if not (computed.has(sp.Float) and expected.has(sp.Float)):
+        return None
+    try:
+        computed_value = complex(sp.N(computed, 30))
+        expected_value = complex(sp.N(expected, 30))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if not (cmath.isfinite(computed_value) and cmath.isfinite(expected_value)):
+        return None
+    return abs(computed_value - expected_value) <= 1e-12 * max(1.0, abs(computed_value))
+
+
+@_sympy_cached
+def _check_equality(expr1, expr2) -> Tuple[bool, str]:
+    """Return whether two expressions are equal and their reduced difference as text.
+
+    Only the verdict and printed difference are kept, so repeated checks of the
+    same pair (e.g. revisited proof transitions) skip the reduction without the
+    cache pinning large expression trees.
+    """
+    difference = expr1 - expr2
+    # Floating-point constants compare within tolerance, sparing simplify
+    numeric = _numbers_match(expr1, expr2) if difference != 0 else None
+    if numeric is not None:
+        return numeric, _to_str(difference)
+    difference = _reduce_difference(difference)
+    is_equal = bool(difference == 0)
+    return is_equal, "0" if is_equal else _to_str(difference)
+
+
+# Plain decimal numbers, e.g. "0", "-2.5", "1e3"
+_RE_DECIMAL = re.compile(r"-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?")
+
+_INFINITIES = {"oo": sp.oo, "inf": sp.oo, "-oo": -sp.oo, "-inf": -sp.oo}
+
+
+def _parse_bound(value: Union[str, float, int, Expr]) -> Any:
+    """Parse an integration limit given as LaTeX, a plain number, or 'oo'/'inf'.
+
+    Plain numbers are converted exactly without going through the LaTeX parser.
+    """
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if text in _INFINITIES:
+        return _INFINITIES[text]
+    if _RE_DECIMAL.fullmatch(text):
+        return sp.Rational(text)
+    return LaTeXParser.parse(text)
+
+
 class SymPyVerifier:
     """Core verification engine using SymPy for symbolic mathematics."""
 
@@ -186,15 +620,14 @@ class SymPyVerifier:
                 expr2 = LaTeXParser.parse(expr2)
 
             # Check if expressions are equal
-            difference = simplify(expr1 - expr2)
-            is_equal = difference == 0
+            is_equal, difference = _check_equality(expr1, expr2)
 
             return {
                 "is_valid": is_equal,
-                "expr1": str(expr1),
-                "expr2": str(expr2),
-                "difference": str(difference),
-                "simplified_difference": str(simplify(difference)),
+                "expr1": _to_str(expr1),
+                "expr2": _to_str(expr2),
+                "difference": difference,
+                "simplified_difference": difference,
                 "explanation": (
                     "Expressions are equal" if is_equal else f"Expressions differ by: {difference}"
                 ),
@@ -229,24 +662,24 @@ class SymPyVerifier:
                 expected_result = LaTeXParser.parse(expected_result)
 
             # Compute derivative
-            var_symbol = symbols(variable)
-            computed_derivative = diff(expr, var_symbol)
+            var_symbol = _sym(variable)
+            computed_derivative = _cdiff(expr, var_symbol)
 
             # Verify
-            difference = simplify(computed_derivative - expected_result)
+            difference = _reduce_difference(computed_derivative - expected_result)
             is_correct = difference == 0
 
             return {
                 "is_valid": is_correct,
-                "original_expr": str(expr),
+                "original_expr": _to_str(expr),
                 "variable": variable,
-                "computed_derivative": str(computed_derivative),
-                "expected_derivative": str(expected_result),
-                "difference": str(difference),
+                "computed_derivative": _to_str(computed_derivative),
+                "expected_derivative": _to_str(expected_result),
+                "difference": "0" if is_correct else _to_str(difference),
                 "explanation": (
                     "Derivative is correct"
                     if is_correct
-                    else f"Derivative differs by: {difference}"
+                    else f"Derivative differs by: {_to_str(difference)}"
                 ),
             }
 
@@ -284,43 +717,48 @@ class SymPyVerifier:
             if isinstance(expected_result, str):
                 expected_result = LaTeXParser.parse(expected_result)
 
-            # Compute integral
-            var_symbol = symbols(variable)
-
-            if definite and limits:
-                computed_integral = integrate(expr, (var_symbol, limits[0], limits[1]))
-            else:
-                computed_integral = integrate(expr, var_symbol)
+            var_symbol = _sym(variable)
 
-            # For indefinite integrals, compare derivatives (since constants can differ)
+            # For indefinite integrals, compare derivatives (since constants can differ).
+            # The derivative of the true antiderivative is the integrand itself, so
+            # verification needs no integration at all.
             if not definite:
-                # Verify by taking derivative of both results
-                derivative_computed = simplify(diff(computed_integral, var_symbol))
-                derivative_expected = simplify(diff(expected_result, var_symbol))
-                difference = simplify(derivative_computed - derivative_expected)
+                difference = _reduce_difference(expr - _cdiff(expected_result, var_symbol))
                 is_correct = difference == 0
 
+                # A correct answer is itself a valid antiderivative; only integrate
+                # to show the expected form when the answer is wrong.
+                computed_integral = expected_result if is_correct else _cintegrate(expr, var_symbol)
                 explanation = (
                     "Integral is correct (derivatives match)"
                     if is_correct
-                    else f"Integrals differ (derivative difference: {difference})"
+                    else f"Integrals differ (derivative difference: {_to_str(difference)})"
                 )
             else:
+                if limits:
+                    computed_integral = _cintegrate(expr, var_symbol, (limits[0], limits[1]))
+                else:
+                    computed_integral = _cintegrate(expr, var_symbol)
+
                 # For definite integrals, compare values directly
-                difference = simplify(computed_integral - expected_result)
-                is_correct = difference == 0
+                is_correct = _numbers_match(computed_integral, expected_result)
+                if is_correct is None:
+                    difference = _reduce_difference(computed_integral - expected_result)
+                    is_correct = difference == 0
+                else:
+                    difference = computed_integral - expected_result
                 explanation = (
                     "Definite integral is correct"
                     if is_correct
-                    else f"Integral differs by: {difference}"
+                    else f"Integral differs by: {_to_str(difference)}"
                 )
 
             return {
                 "is_valid": is_correct,
-                "original_expr": str(expr),
+                "original_expr": _to_str(expr),
                 "variable": variable,
-                "computed_integral": str(computed_integral),
-                "expected_integral": str(expected_result),
+                "computed_integral": _to_str(computed_integral),
+                "expected_integral": _to_str(expected_result),
                 "definite": definite,
                 "limits": str(limits) if limits else None,
                 "explanation": explanation,
@@ -367,24 +805,28 @@ class SymPyVerifier:
                 point = -sp.oo
 
             # Compute limit
-            var_symbol = symbols(variable)
+            var_symbol = _sym(variable)
             computed_limit = limit(expr, var_symbol, point, dir=direction)
 
-            # Verify
-            difference = simplify(computed_limit - expected_result)
-            is_correct = difference == 0
+            # Verify, within tolerance only when both limits are floating-point numbers
+            is_correct = _numbers_match(computed_limit, expected_result)
+            if is_correct is None:
+                difference = _reduce_difference(computed_limit - expected_result)
+                is_correct = difference == 0
+            else:
+                difference = computed_limit - expected_result
 
             return {
                 "is_valid": is_correct,
-                "original_expr": str(expr),
+                "original_expr": _to_str(expr),
                 "variable": variable,
-                "point": str(point),
+                "point": _to_str(point),
                 "direction": direction,
-                "computed_limit": str(computed_limit),
-                "expected_limit": str(expected_result),
-                "difference": str(difference),
+                "computed_limit": _to_str(computed_limit),
+                "expected_limit": _to_str(expected_result),
+                "difference": _to_str(difference),
                 "explanation": (
-                    "Limit is correct" if is_correct else f"Limit differs by: {difference}"
+                    "Limit is correct" if is_correct else f"Limit differs by: {_to_str(difference)}"
                 ),
             }
 
@@ -415,56 +857,246 @@ class SymPyVerifier:
             steps = []
 
             # Original
-            steps.append({"step": "Original", "expression": str(expr)})
+            steps.append({"step": "Original", "expression": _to_str(expr)})
+
+            # Symbols and numbers are already as simple as they get
+            if getattr(expr, "is_Atom", False):
+                return {
+                    "original": _to_str(expr),
+                    "simplified": _to_str(expr),
+                    "steps": steps if show_steps else None,
+                    "explanation": f"Expression {_to_str(expr)} is already in simplest form",
+                }
+
+            # expand, factor and cancel only rewrite sums; without an Add anywhere
+            # in the tree they return the expression unchanged
+            has_sum = expr.has(sp.Add)
 
             # Expand
-            expanded = expand(expr)
-            if expanded != expr:
-                steps.append({"step": "Expanded", "expression": str(expanded)})
+            if has_sum:
+                expanded = _cexpand(expr)
+                if expanded != expr:
+                    steps.append({"step": "Expanded", "expression": _to_str(expanded)})
 
             # Factor
-            factored = factor(expr)
-            if factored != expr:
-                steps.append({"step": "Factored", "expression": str(factored)})
-
-            # Simplify
-            simplified = simplify(expr)
-            steps.append({"step": "Simplified", "expression": str(simplified)})
-
-            # Cancel (for rational functions)
-            try:
-                cancelled = cancel(expr)
+            if has_sum:
+                factored = _cfactor(expr)
+                if factored != expr:
+                    steps.append({"step": "Factored", "expression": _to_str(factored)})
+
+            # Simplify, factoring out repeated subexpressions first so simplify
+            # (super-linear in expression size) works on the smaller reduced form
+            simplified = None
+            timed_out = False
+            if isinstance(expr, Expr):
+                replacements, reduced = sp.cse([expr])
+                if replacements:
+                    steps.append(
+                        {
+                            "step": "Common subexpressions",
+                            "expression": ", ".join(f"{sym} = {sub}" for sym, sub in replacements),
+                        }
+                    )
+                    try:
+                        candidate = _csimplify(reduced[0])
+                    except SimplifyTimeoutError:
+                        candidate = None
+                    if candidate is not None:
+                        # Substitute innermost-last: later replacements may refer to earlier ones
+                        for sym, sub in reversed(replacements):
+                            candidate = candidate.xreplace({sym: sub})
+                        # The reduced form hides relations between replaced terms; if it
+                        # made no progress, fall back to simplifying the full expression
+                        if sp.count_ops(candidate) < sp.count_ops(expr):
+                            simplified = candidate
+            if simplified is None:
+                try:
+                    simplified = _csimplify(expr)
+                except SimplifyTimeoutError:
+                    simplified = expr
+                    timed_out = True
+            steps.append({"step": "Simplified", "expression": _to_str(simplified)})
+
+            # Cancel (for rational functions, i.e. sums with a denominator somewhere)
+            if has_sum and _has_denominator(expr):
+                cancelled = _ccancel(expr)
                 if cancelled != simplified:
-                    steps.append({"step": "Cancelled", "expression": str(cancelled)})
-            except:
-                pass
+                    steps.append({"step": "Cancelled", "expression": _to_str(cancelled)})
 
             return {
-                "original": str(expr),
-                "simplified": str(simplified),
+                "original": _to_str(expr),
+                "simplified": _to_str(simplified),
                 "steps": steps if show_steps else None,
-                "explanation": f"Expression simplified from {expr} to {simplified}",
+                "explanation": (
+                    "Simplification timed out; returning the expression unsimplified"
+                    if timed_out
+                    else f"Expression simplified from {_to_str(expr)} to {_to_str(simplified)}"
+                ),
             }
 
         except Exception as e:
             return {"error": str(e), "explanation": f"Simplification failed: {str(e)}"}
 
 
+# With MCP_PROOF_WORKERS > 1, proofs with at least this many steps validate their
+# steps in worker processes. Off by default: each spawned worker imports SymPy and
+# starts with cold caches, so the pool is slower than serial validation unless
+# individual steps are expensive (e.g. hard integrals).
+_PARALLEL_MIN_STEPS = 4
+_PROOF_WORKERS = _env_number("MCP_PROOF_WORKERS", 1, int)
+_proof_pool: Optional[ProcessPoolExecutor] = None
+_proof_pool_failed = False
+
+
+def _discard_proof_pool() -> None:
+    """Shut down a failed pool and fall back to serial validation from now on."""
+    global _proof_pool, _proof_pool_failed
+    if _proof_pool is not None:
+        _proof_pool.shutdown(wait=False, cancel_futures=True)
+    _proof_pool = None
+    _proof_pool_failed = True
+
+
+def _get_proof_pool() -> ProcessPoolExecutor:
+    """Return the shared proof-validation pool, creating it on first use."""
+    global _proof_pool
+    if _proof_pool is None:
+        # spawn, not fork: the server process runs an event loop and threads
+        _proof_pool = ProcessPoolExecutor(
+            max_workers=_PROOF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _proof_pool
+
+
+def _step_failed(step_result: Dict[str, Any]) -> bool:
+    """Return whether a validated step or its transition was found invalid."""
+    return step_result.get("is_valid") is False or step_result.get("transition_valid") is False
+
+
+_CALCULUS_CHECKS = {
+    "derivative": SymPyVerifier.verify_derivative,
+    "integral": SymPyVerifier.verify_integral,
+}
+
+
+def _justification_operation(justification: str) -> Optional[str]:
+    """Classify a justification as "derivative", "integral", or None for plain equality.
+
+    Differentiation takes precedence when both kinds of keyword appear.
+    """
+    initials = {m.group(0)[0].lower() for m in _RE_CALCULUS_KEYWORD.finditer(justification)}
+    if "d" in initials:
+        return "derivative"
+    if "i" in initials:
+        return "integral"
+    return None
+
+
+def _validate_step(
+    step_num: int,
+    step: Dict[str, str],
+    previous_expr: Optional[str],
+    assumptions: List[str],
+    parsed: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Validate one proof step and its transition from the previous step.
+
+    Args:
+        step_num: 1-based position of the step in the proof
+        step: Step dict with 'expression', 'justification', and optionally 'result'
+        previous_expr: Result (or expression) of the previous step (ignored for step 1)
+        assumptions: List of assumptions
+        parsed: Optional map of LaTeX source to already-parsed SymPy objects
+
+    Returns:
+        Dict with the step's validation result
+    """
+    if parsed is None:
+        parsed = {}
+
+    try:
+        # Parse current step
+        current_expr = step.get("expression")
+        justification = step.get("justification", "")
+        expected_result = step.get("result")
+
+        step_result = {
+            "step_number": step_num,
+            "expression": current_expr,
+            "justification": justification,
+            "is_valid": None,
+            "explanation": "",
+        }
+
+        # If there's an expected result, verify it
+        if expected_result:
+            verification = SymPyVerifier.verify_equality(
+                parsed.get(current_expr, current_expr),
+                parsed.get(expected_result, expected_result),
+                assumptions,
+            )
+            step_result["is_valid"] = verification["is_valid"]
+            step_result["explanation"] = verification["explanation"]
+
+        # Check if this step follows from the previous step
+        if step_num > 1:
+            # Determine verification type based on justification
+            operation = _justification_operation(justification)
+            if operation is None:
+                # Generic equivalence check
+                verification = SymPyVerifier.verify_equality(
+                    parsed.get(previous_expr, previous_expr),
+                    parsed.get(current_expr, current_expr),
+                    assumptions,
+                )
+            else:
+                # Extract variable from justification if possible
+                var_match = _RE_WITH_RESPECT_TO.search(justification)
+                variable = var_match.group(1) if var_match else "x"
+
+                verification = _CALCULUS_CHECKS[operation](
+                    parsed.get(previous_expr, previous_expr),
+                    variable,
+                    parsed.get(current_expr, current_expr),
+                )
+
+            step_result["transition_valid"] = verification["is_valid"]
+            step_result["transition_explanation"] = verification["explanation"]
+
+        return step_result
+
+    except Exception as e:
+        return {
+            "step_number": step_num,
+            "expression": step.get("expression", ""),
+            "is_valid": False,
+            "error": str(e),
+            "explanation": f"Step validation failed: {str(e)}",
+        }
+
+
 class ProofStepValidator:
     """Validator for multi-step mathematical proofs."""
 
     def __init__(self):
         """Initialize the proof validator."""
-        self.verifier = SymPyVerifier()
+        # Steps are checked through SymPyVerifier's static methods, whose caches
+        # are module-level and shared by every validator
+        pass
 
     def validate_proof(
-        self, steps: List[Dict[str, str]], assumptions: List[str] = None
+        self, steps: List[Dict[str, str]], assumptions: List[str] = None, fail_fast: bool = False
     ) -> Dict[str, Any]:
         """Validate a multi-step proof.
 
+        Steps are independent once the previous expression is known, so with
+        MCP_PROOF_WORKERS > 1 long proofs are validated in worker processes;
+        by default they are validated serially.
+
         Args:
             steps: List of proof steps, each containing 'expression', 'justification', and optionally 'result'
             assumptions: Optional list of assumptions
+            fail_fast: Stop at the first invalid step; later steps are reported as skipped
 
         Returns:
             Dict with validation results for each step
@@ -472,121 +1104,87 @@ class ProofStepValidator:
         if assumptions is None:
             assumptions = []
 
-        results = []
-        all_valid = True
-
-        for i, step in enumerate(steps):
-            step_num = i + 1
+        previous_exprs = [None] + [
+            step.get("result") or step.get("expression") for step in steps[:-1]
+        ]
 
+        results = None
+        if _PROOF_WORKERS > 1 and len(steps) >= _PARALLEL_MIN_STEPS and not _proof_pool_failed:
             try:
-                # Parse current step
-                current_expr = step.get("expression")
-                justification = step.get("justification", "")
-                expected_result = step.get("result")
-
-                step_result = {
-                    "step_number": step_num,
-                    "expression": current_expr,
-                    "justification": justification,
+                pool = _get_proof_pool()
+                futures = [
+                    pool.submit(_validate_step, i + 1, step, previous_exprs[i], assumptions)
+                    for i, step in enumerate(steps)
+                ]
+                results = []
+                for future in futures:
+                    results.append(future.result())
+                    if fail_fast and _step_failed(results[-1]):
+                        for pending in futures[len(results) :]:
+                            pending.cancel()
+                        break
+            except Exception:
+                # Pool unavailable (e.g. workers cannot start); validate serially instead
+                _discard_proof_pool()
+                results = None
+
+        if results is None:
+            # Parse each distinct expression once; the verifiers accept SymPy objects.
+            # Strings that fail to parse are kept so the verifier reports the error.
+            parsed: Dict[str, Any] = {}
+            for step in steps:
+                for key in ("expression", "result"):
+                    source = step.get(key)
+                    if isinstance(source, str) and source and source not in parsed:
+                        try:
+                            parsed[source] = LaTeXParser.parse(source)
+                        except ValueError:
+                            parsed[source] = source
+
+            results = []
+            for i, step in enumerate(steps):
+                results.append(_validate_step(i + 1, step, previous_exprs[i], assumptions, parsed))
+                if fail_fast and _step_failed(results[-1]):
+                    break
+
+        all_valid = not any(_step_failed(r) for r in results)
+
+        # Steps not checked after a fail-fast stop
+        for i in range(len(results), len(steps)):
+            results.append(
+                {
+                    "step_number": i + 1,
+                    "expression": steps[i].get("expression"),
                     "is_valid": None,
-                    "explanation": "",
+                    "skipped": True,
+                    "explanation": "Skipped after an earlier invalid step",
                 }
-
-                # If there's an expected result, verify it
-                if expected_result:
-                    verification = self.verifier.verify_equality(
-                        current_expr, expected_result, assumptions
-                    )
-                    step_result["is_valid"] = verification["is_valid"]
-                    step_result["explanation"] = verification["explanation"]
-
-                    if not verification["is_valid"]:
-                        all_valid = False
-
-                # Check if this step follows from the previous step
-                if i > 0:
-                    previous_expr = steps[i - 1].get("result") or steps[i - 1].get("expression")
-
-                    # Determine verification type based on justification
-                    if (
-                        "derivative" in justification.lower()
-                        or "differentiate" in justification.lower()
-                    ):
-                        # Extract variable from justification if possible
-                        var_match = re.search(r"with respect to (\w+)", justification)
-                        if var_match:
-                            variable = var_match.group(1)
-                        else:
-                            variable = "x"  # default
-
-                        verification = self.verifier.verify_derivative(
-                            previous_expr, variable, current_expr
-                        )
-                        step_result["transition_valid"] = verification["is_valid"]
-                        step_result["transition_explanation"] = verification["explanation"]
-
-                        if not verification["is_valid"]:
-                            all_valid = False
-
-                    elif (
-                        "integrate" in justification.lower() or "integral" in justification.lower()
-                    ):
-                        var_match = re.search(r"with respect to (\w+)", justification)
-                        if var_match:
-                            variable = var_match.group(1)
-                        else:
-                            variable = "x"
-
-                        verification = self.verifier.verify_integral(
-                            previous_expr, variable, current_expr
-                        )
-                        step_result["transition_valid"] = verification["is_valid"]
-                        step_result["transition_explanation"] = verification["explanation"]
-
-                        if not verification["is_valid"]:
-                            all_valid = False
-
-                    else:
-                        # Generic equivalence check
-                        verification = self.verifier.verify_equality(
-                            previous_expr, current_expr, assumptions
-                        )
-                        step_result["transition_valid"] = verification["is_valid"]
-                        step_result["transition_explanation"] = verification["explanation"]
-
-                        if not verification["is_valid"]:
-                            all_valid = False
-
-                results.append(step_result)
-
-            except Exception as e:
-                results.append(
-                    {
-                        "step_number": step_num,
-                        "expression": step.get("expression", ""),
-                        "is_valid": False,
-                        "error": str(e),
-                        "explanation": f"Step validation failed: {str(e)}",
-                    }
-                )
-                all_valid = False
+            )
 
         return {
             "all_steps_valid": all_valid,
             "total_steps": len(steps),
-            "valid_steps": sum(1 for r in results if r.get("is_valid") != False),
+            "valid_steps": sum(
+                1 for r in results if r.get("is_valid") is not False and not r.get("skipped")
+            ),
             "steps": results,
             "assumptions": assumptions,
         }
 
 
+# The validator holds no state, so every verify_proof call shares one instance
+_proof_validator = ProofStepValidator()
+
+
 # ============================================================================
 # MCP Tools
 # ============================================================================
 
 
 @mcp.tool
-def verify_proof(steps: List[Dict[str, str]], assumptions: List[str] = None) -> Dict[str, Any]:
+def verify_proof(
+    steps: List[Dict[str, str]], assumptions: List[str] = None, fail_fast: bool = False
+) -> Dict[str, Any]:
     """Verify a multi-step mathematical proof by checking each step's validity
     and whether each step follows logically from the previous one.
 
@@ -599,6 +1197,7 @@ def verify_proof(steps: List[Dict[str, str]], assumptions: List[str] = None) ->
                - 'justification': Reason for this step (e.g., "differentiate with respect to x")
                - 'result' (optional): Expected result after this step
         assumptions: Optional list of assumptions (e.g., ["x is real", "n is positive"])
+        fail_fast: Stop checking at the first invalid step; later steps are marked skipped
 
     Example:
         steps = [
@@ -613,8 +1212,7 @@ def verify_proof(steps: List[Dict[str, str]], assumptions: List[str] = None) ->
         assumptions = []
 
     try:
-        validator = ProofStepValidator()
-        result = validator.validate_proof(steps, assumptions)
+        result = _proof_validator.validate_proof(steps, assumptions, fail_fast=fail_fast)
 
         return {
             "success": True,
@@ -644,8 +1242,7 @@ def simplify_expression(expression: str, show_steps: bool = True) -> Dict[str, A
         simplify_expression("\\frac{x^2 - 1}{x - 1}", show_steps=True)
     """
     try:
-        verifier = SymPyVerifier()
-        result = verifier.simplify_expression(expression, show_steps)
+        result = SymPyVerifier.simplify_expression(expression, show_steps)
 
         if "error" in result:
             return {
@@ -687,8 +1284,7 @@ def verify_equivalence(expr1: str, expr2: str, assumptions: List[str] = None) ->
         assumptions = []
 
     try:
-        verifier = SymPyVerifier()
-        result = verifier.verify_equality(expr1, expr2, assumptions)
+        result = SymPyVerifier.verify_equality(expr1, expr2, assumptions)
 
         return {
             "success": True,
@@ -729,27 +1325,33 @@ def check_identity(
         # Parse the identity expression
         expr = LaTeXParser.parse(identity_expr)
 
-        # Simplify to check if it equals zero
-        simplified = simplify(expr)
+        # Reduce to check if it equals zero, trying cheap canonicalizers first
+        simplified = _reduce_difference(expr)
 
         is_identity = simplified == 0
 
         result_data = {
             "identity_expr": identity_expr,
-            "parsed": str(expr),
-            "simplified": str(simplified),
+            "parsed": _to_str(expr),
+            "simplified": _to_str(simplified),
             "is_identity": is_identity,
             "test_results": [],
         }
 
         # Test with specific values if provided
         if test_values is not None and len(test_values) > 0:
-            var_symbol = symbols(variable)
+            var_symbol = _sym(variable)
+            try:
+                evaluate = _clambdify(expr, var_symbol)
+            except Exception:
+                evaluate = None
 
             for val in test_values:
                 try:
-                    result = expr.subs(var_symbol, val)
-                    result_float = float(result.evalf())
+                    if evaluate is not None:
+                        result_float = float(evaluate(val))
+                    else:
+                        result_float = float(expr.subs(var_symbol, val).evalf())
                     result_data["test_results"].append(
                         {
                             "value": val,
@@ -795,8 +1397,7 @@ def verify_derivative(expression: str, variable: str, expected_derivative: str)
         verify_derivative("\\sin(x) \\cos(x)", "x", "\\cos^2(x) - \\sin^2(x)")
     """
     try:
-        verifier = SymPyVerifier()
-        result = verifier.verify_derivative(expression, variable, expected_derivative)
+        result = SymPyVerifier.verify_derivative(expression, variable, expected_derivative)
 
         return {
             "success": True,
@@ -840,26 +1441,12 @@ def verify_integral(
         verify_integral("x", "x", "\\frac{1}{2}", is_definite=True, lower_limit="0", upper_limit="1")
     """
     try:
-        verifier = SymPyVerifier()
-
         # Parse limits if provided
         limits = None
         if is_definite and lower_limit is not None and upper_limit is not None:
-            try:
-                lower = (
-                    LaTeXParser.parse(lower_limit) if isinstance(lower_limit, str) else lower_limit
-                )
-                upper = (
-                    LaTeXParser.parse(upper_limit) if isinstance(upper_limit, str) else upper_limit
-                )
-                limits = (lower, upper)
-            except:
-                # Try as numbers
-                lower = float(lower_limit) if lower_limit != "oo" else sp.oo
-                upper = float(upper_limit) if upper_limit != "oo" else sp.oo
-                limits = (lower, upper)
-
-        result = verifier.verify_integral(
+            limits = (_parse_bound(lower_limit), _parse_bound(upper_limit))
+
+        result = SymPyVerifier.verify_integral(
             expression, variable, expected_integral, definite=is_definite, limits=limits
         )
 
@@ -879,6 +1466,57 @@ def verify_integral(
         }
 
 
+# In-memory caches emptied by the clear_caches tool
+_MEMORY_CACHES = {
+    "parse": _parse_cached,
+    "simplify": _csimplify,
+    "expand": _cexpand,
+    "factor": _cfactor,
+    "cancel": _ccancel,
+    "trigsimp": _ctrigsimp,
+    "diff": _cdiff,
+    "integrate": _cintegrate,
+    "lambdify": _clambdify,
+    "equality": _check_equality,
+    "symbols": _sym,
+    "print": _print_cached,
+}
+
+
+@mcp.tool
+def clear_caches() -> Dict[str, Any]:
+    """Clear the server's in-memory parse and computation caches, along with SymPy's
+    global cache. Only needed when a long-running server's memory use grows;
+    results are never stale.
+
+    Returns {"success": bool, "data": {"cleared": {cache: int}}, "message": str,
+    "error": str|null}, where each count is the number of entries dropped.
+    """
+    try:
+        cleared = {}
+        for name, cached in _MEMORY_CACHES.items():
+            cleared[name] = cached.cache_info().currsize
+            cached.cache_clear()
+        # SymPy's own global cache of intermediate results
+        cleared["sympy"] = sum(f.cache_info().currsize for f in sympy_cache.CACHE)
+        sympy_cache.clear_cache()
+
+        return {
+            "success": True,
+            "data": {"cleared": cleared},
+            "message": f"Cleared {sum(cleared.values())} cached entries",
+            "error": None,
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "data": None,
+            "message": "Error clearing caches",
+            "error": str(e),
+        }
+
+
 def main():
     """Run the FastMCP Mathematical Verification server"""
     try:
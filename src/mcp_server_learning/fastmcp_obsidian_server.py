@@ -8,6 +8,7 @@ consistency with other servers in this project.
 
 import os
 import sys
+from itertools import chain
 from typing import Any, Dict, List, Optional
 
 from fastmcp import FastMCP
@@ -36,13 +37,20 @@ Requires: OBSIDIAN_VAULT_PATH environment variable set to the vault directory.
 )
 
 
+# One connector per vault path, so its note cache survives across tool calls
+_connectors: Dict[str, ObsidianConnector] = {}
+
+
 def _get_connector() -> ObsidianConnector:
     vault_path = os.getenv("OBSIDIAN_VAULT_PATH")
     if not vault_path:
         raise RuntimeError(
             "OBSIDIAN_VAULT_PATH environment variable must be set to your Obsidian vault path"
         )
-    return ObsidianConnector(vault_path)
+    connector = _connectors.get(vault_path)
+    if connector is None:
+        connector = _connectors[vault_path] = ObsidianConnector(vault_path)
+    return connector
 
 
 @mcp.tool
@@ -257,7 +265,7 @@ def get_backlinks(note_name: str) -> Dict[str, Any]:
     """
     try:
         obsidian = _get_connector()
-        backlinks = obsidian.scanner.get_backlinks(note_name)
+        backlinks = obsidian.get_backlinks(note_name)
 
         if not backlinks:
             return {
@@ -292,7 +300,7 @@ def get_orphaned_notes() -> Dict[str, Any]:
     """
     try:
         obsidian = _get_connector()
-        orphaned = obsidian.scanner.get_orphaned_notes()
+        orphaned = obsidian.get_orphaned_notes()
 
         if not orphaned:
             return {
@@ -435,9 +443,7 @@ def extract_note_blocks(note_name: str, block_types: Optional[List[str]] = None)
                 "error": "Note not found",
             }
 
-        blocks = note["blocks"]
-        if block_types:
-            blocks = [block for block in blocks if block["type"] in block_types]
+        blocks = obsidian.get_note_blocks(note, block_types)
 
         if not blocks:
             filter_msg = f" of type(s) {', '.join(block_types)}" if block_types else ""
@@ -500,11 +506,13 @@ def get_flashcard_content(
         if tag_filter:
             notes_to_process = obsidian.get_notes_by_tag(tag_filter)
         else:
-            notes_to_process = []
+            # Repeated names resolve to the same note; extract each note once
+            notes_by_path = {}
             for name in note_names:
                 note = obsidian.get_note_by_name(name)
                 if note:
-                    notes_to_process.append(note)
+                    notes_by_path.setdefault(note["path"], note)
+            notes_to_process = list(notes_by_path.values())
 
         if not notes_to_process:
             return {
@@ -514,10 +522,12 @@ def get_flashcard_content(
                 "error": None,
             }
 
-        all_flashcard_content: List[Dict[str, Any]] = []
-        for note in notes_to_process:
-            content = obsidian.extract_content_for_flashcards(note, content_types)
-            all_flashcard_content.extend(content)
+        all_flashcard_content: List[Dict[str, Any]] = list(
+            chain.from_iterable(
+                obsidian.extract_content_for_flashcards(note, content_types)
+                for note in notes_to_process
+            )
+        )
 
         if not all_flashcard_content:
             return {
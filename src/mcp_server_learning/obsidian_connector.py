@@ -1,15 +1,163 @@
 #!/usr/bin/env python3
 
 import hashlib
+import heapq
 import json
+import multiprocessing
 import os
+import pickle
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import yaml
 
+try:
+    # libyaml-backed loader: several times faster on frontmatter-heavy vaults
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+# [[target#header|display]] wikilinks
+_WIKILINK_RE = re.compile(r"\[\[([^\]]+)\]\]")
+
+# Inline #tags at the start of a line or after whitespace
+_INLINE_TAG_RE = re.compile(r"(?:^|\s)#([a-zA-Z0-9/_-]+)", re.MULTILINE)
+
+# "## Header" lines
+_HEADER_RE = re.compile(r"^(#{1,6})\s+(.+)")
+
+# Anchor cleanup: markdown emphasis, then punctuation, then runs of spaces/hyphens
+_ANCHOR_FORMATTING_RE = re.compile(r"[*_`]")
+_ANCHOR_PUNCTUATION_RE = re.compile(r"[^\w\s-]")
+_ANCHOR_SEPARATOR_RE = re.compile(r"[-\s]+")
+
+# Line prefixes that start list, numbered list, quote and header blocks
+_BULLET_LINE_RE = re.compile(r"^\s*[-*+]\s")
+_NUMBERED_LINE_RE = re.compile(r"^\s*\d+\.\s")
+_QUOTE_LINE_RE = re.compile(r"^\s*>\s")
+_HEADER_LINE_RE = re.compile(r"^#{1,6}\s")
+
+# {{variable}} template placeholders
+_TEMPLATE_VAR_RE = re.compile(r"\{\{([^}]+)\}\}")
+
+# Sentence patterns that suggest a definition, e.g. "A matrix is ..."
+_DEFINITION_RE = re.compile(r"\b(is|are|means|refers to|defined as)\b", re.IGNORECASE)
+
+# Leading bullet or number marker of a list item
+_LIST_MARKER_RE = re.compile(r"^\s*[-*+\d.]\s*")
+
+# Leading "> " of each quoted line
+_QUOTE_MARKER_RE = re.compile(r"^\s*>\s*", re.MULTILINE)
+
+
+# Parsed notes persisted across server restarts, one file per vault
+_INDEX_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "mcp-learning"
+# Bump when the parsed note format changes, so stale index files are ignored
+_INDEX_CACHE_VERSION = 1
+
+# Parsed notes keyed by (absolute path, mtime in ns, size), as in the vault signature
+ParsedNotes = Dict[Tuple[str, int, int], Dict[str, Any]]
+
+
+def _index_cache_path(vault_path: str) -> Path:
+    """Return the index file for a vault, named after a hash of its resolved path."""
+    digest = hashlib.sha1(str(Path(vault_path).resolve()).encode()).hexdigest()[:16]
+    return _INDEX_CACHE_DIR / f"obsidian-index-{digest}.pickle"
+
+
+def _load_index_cache(vault_path: str) -> ParsedNotes:
+    """Load a vault's persisted parsed notes, or an empty dict when there are none."""
+    try:
+        with open(_index_cache_path(vault_path), "rb") as f:
+            stored = pickle.load(f)
+        if stored.get("version") == _INDEX_CACHE_VERSION:
+            return dict(stored["notes"])
+    except (
+        OSError,
+        EOFError,
+        ImportError,
+        pickle.UnpicklingError,
+        AttributeError,
+        KeyError,
+        TypeError,
+        ValueError,
+    ):
+        pass
+    return {}
+
+
+def _save_index_cache(vault_path: str, notes: ParsedNotes) -> None:
+    """Persist parsed notes so a restarted server only parses changed files."""
+    path = _index_cache_path(vault_path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {"version": _INDEX_CACHE_VERSION, "notes": notes},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"Failed to save Obsidian index cache: {e}", file=sys.stderr)
+
+
+# Scans with at least this many new or changed notes parse them in worker
+# processes; below it, starting the pool costs more than it saves.
+_PARALLEL_MIN_NOTES = 256
+
+
+def _env_parse_workers() -> int:
+    """Read MCP_PARSE_WORKERS, falling back to up to 4 CPUs if unset or invalid."""
+    default = min(4, os.cpu_count() or 1)
+    value = os.getenv("MCP_PARSE_WORKERS")
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid MCP_PARSE_WORKERS={value!r}; using {default}", file=sys.stderr)
+        return default
+
+
+_PARSE_WORKERS = _env_parse_workers()
+
+
+def _parse_note_file(
+    vault_path: str, file_path: str
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Parse one note in a worker process, returning (note, None) or (None, error)."""
+    try:
+        return ObsidianVaultScanner(vault_path).parse_note(Path(file_path)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _iter_note_files(root: Path) -> Iterator[os.DirEntry]:
+    """Yield the markdown files under ``root`` with a recursive scandir walk.
+
+    Like ``Path.rglob``, directory symlinks are not followed; ``.obsidian``
+    folders are pruned rather than walked and filtered out afterwards.
+    """
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name != ".obsidian":
+                yield from _iter_note_files(entry.path)
+        elif entry.name.endswith(".md"):
+            yield entry
+
 
 class ObsidianMarkdownParser:
     """Parser for Obsidian markdown files with frontmatter, links, and tags."""
@@ -28,7 +176,9 @@ class ObsidianMarkdownParser:
             frontmatter_yaml = parts[1].strip()
             body = parts[2].lstrip("\n")
 
-            frontmatter = yaml.safe_load(frontmatter_yaml) if frontmatter_yaml else {}
+            frontmatter = (
+                yaml.load(frontmatter_yaml, Loader=_YamlLoader) if frontmatter_yaml else {}
+            )
             return frontmatter or {}, body
 
         except yaml.YAMLError:
@@ -37,11 +187,8 @@ class ObsidianMarkdownParser:
     @staticmethod
     def extract_wikilinks(content: str) -> List[Dict[str, str]]:
         """Extract [[wikilinks]] from content."""
-        pattern = r"\[\[([^\]]+)\]\]"
-        matches = re.finditer(pattern, content)
-
         links = []
-        for match in matches:
+        for match in _WIKILINK_RE.finditer(content):
             full_link = match.group(1)
 
             # Handle display text: [[link|display]]
@@ -69,23 +216,24 @@ class ObsidianMarkdownParser:
 
     @staticmethod
     def extract_tags(content: str, frontmatter: Dict[str, Any] = None) -> Set[str]:
-        """Extract tags from content and frontmatter."""
+        """Extract tags from content and frontmatter.
+
+        Tags are interned, so notes sharing a tag share one string object.
+        """
         tags = set()
 
         # Tags from frontmatter
         if frontmatter:
             fm_tags = frontmatter.get("tags", [])
             if isinstance(fm_tags, str):
-                fm_tags = [fm_tags]
+                fm_tags = [sys.intern(fm_tags)]
             elif isinstance(fm_tags, list):
-                fm_tags = [str(tag) for tag in fm_tags]
+                fm_tags = [sys.intern(str(tag)) for tag in fm_tags]
             tags.update(fm_tags)
 
         # Inline tags (#tag)
-        inline_pattern = r"(?:^|\s)#([a-zA-Z0-9/_-]+)"
-        inline_matches = re.finditer(inline_pattern, content, re.MULTILINE)
-        for match in inline_matches:
-            tags.add(match.group(1))
+        for match in _INLINE_TAG_RE.finditer(content):
+            tags.add(sys.intern(match.group(1)))
 
         return tags
 
@@ -96,7 +244,7 @@ class ObsidianMarkdownParser:
         lines = content.split("\n")
 
         for i, line in enumerate(lines):
-            header_match = re.match(r"^(#{1,6})\s+(.+)", line)
+            header_match = line.startswith("#") and _HEADER_RE.match(line)
             if header_match:
                 level = len(header_match.group(1))
                 text = header_match.group(2).strip()
@@ -116,10 +264,10 @@ class ObsidianMarkdownParser:
     def _create_anchor(text: str) -> str:
         """Create Obsidian-style anchor from header text."""
         # Remove markdown formatting
-        clean_text = re.sub(r"[*_`]", "", text)
+        clean_text = _ANCHOR_FORMATTING_RE.sub("", text)
         # Convert to lowercase and replace spaces/special chars with hyphens
-        anchor = re.sub(r"[^\w\s-]", "", clean_text.lower())
-        anchor = re.sub(r"[-\s]+", "-", anchor)
+        anchor = _ANCHOR_PUNCTUATION_RE.sub("", clean_text.lower())
+        anchor = _ANCHOR_SEPARATOR_RE.sub("-", anchor)
         return anchor.strip("-")
 
     @staticmethod
@@ -183,13 +331,13 @@ class ObsidianMarkdownParser:
                     current_block = []
                     current_type = None
             else:
-                if re.match(r"^\s*[-*+]\s", line):
+                if _BULLET_LINE_RE.match(line):
                     block_type = "list"
-                elif re.match(r"^\s*\d+\.\s", line):
+                elif _NUMBERED_LINE_RE.match(line):
                     block_type = "numbered_list"
-                elif re.match(r"^\s*>\s", line):
+                elif _QUOTE_LINE_RE.match(line):
                     block_type = "quote"
-                elif re.match(r"^#{1,6}\s", line):
+                elif _HEADER_LINE_RE.match(line):
                     block_type = "header"
                 else:
                     block_type = "paragraph"
@@ -237,20 +385,73 @@ class ObsidianVaultScanner:
         """Get all markdown notes in the vault."""
         notes = []
 
-        for md_file in self.vault_path.rglob("*.md"):
-            # Skip files in .obsidian directory
-            if ".obsidian" in md_file.parts:
-                continue
-
+        for entry in _iter_note_files(self.vault_path):
+            md_file = Path(entry.path)
             try:
                 note_data = self.parse_note(md_file)
                 notes.append(note_data)
             except Exception as e:
-                print(f"Error parsing {md_file}: {e}")
+                print(f"Error parsing {md_file}: {e}", file=sys.stderr)
                 continue
 
         return notes
 
+    def get_vault_signature(self) -> frozenset:
+        """Return (path, mtime, size) for every note file, to detect vault changes cheaply."""
+        signature = []
+        for entry in _iter_note_files(self.vault_path):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            signature.append((entry.path, stat.st_mtime_ns, stat.st_size))
+        return frozenset(signature)
+
+    def parse_notes(self, signature: frozenset, previous: ParsedNotes) -> ParsedNotes:
+        """Parse the note files in a vault signature, in path order, reusing
+        ``previous`` results for files whose path, mtime and size are unchanged."""
+        entries = sorted(signature)
+        to_parse = [entry for entry in entries if entry not in previous]
+        fresh: ParsedNotes = {}
+
+        outcomes = None
+        if _PARSE_WORKERS > 1 and len(to_parse) >= _PARALLEL_MIN_NOTES:
+            try:
+                # spawn, not fork: the server process runs an event loop and threads
+                with ProcessPoolExecutor(
+                    max_workers=_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                ) as pool:
+                    outcomes = list(
+                        pool.map(
+                            partial(_parse_note_file, str(self.vault_path)),
+                            [entry[0] for entry in to_parse],
+                            chunksize=64,
+                        )
+                    )
+            except Exception:
+                # Pool unavailable (e.g. workers cannot start); parse serially instead
+                outcomes = None
+
+        if outcomes is None:
+            for entry in to_parse:
+                try:
+                    fresh[entry] = self.parse_note(Path(entry[0]))
+                except Exception as e:
+                    print(f"Error parsing {entry[0]}: {e}", file=sys.stderr)
+        else:
+            for entry, (note, error) in zip(to_parse, outcomes):
+                if error is None:
+                    fresh[entry] = note
+                else:
+                    print(f"Error parsing {entry[0]}: {error}", file=sys.stderr)
+
+        parsed = {}
+        for entry in entries:
+            note = previous.get(entry) or fresh.get(entry)
+            if note is not None:
+                parsed[entry] = note
+        return parsed
+
     def parse_note(self, file_path: Path) -> Dict[str, Any]:
         """Parse a single note file."""
         with open(file_path, "r", encoding="utf-8") as f:
@@ -421,21 +622,17 @@ class ObsidianTemplateEngine:
         # Merge with provided variables
         all_vars = {**default_vars, **variables}
 
-        # Replace template variables ({{variable}} format)
-        template_pattern = r"\{\{([^}]+)\}\}"
-
         def replace_var(match):
             var_name = match.group(1).strip()
             return str(all_vars.get(var_name, match.group(0)))
 
-        return re.sub(template_pattern, replace_var, content)
+        # Replace template variables ({{variable}} format)
+        return _TEMPLATE_VAR_RE.sub(replace_var, content)
 
     @staticmethod
     def extract_template_variables(content: str) -> Set[str]:
         """Extract all template variables from content."""
-        pattern = r"\{\{([^}]+)\}\}"
-        matches = re.finditer(pattern, content)
-        return {match.group(1).strip() for match in matches}
+        return {match.group(1).strip() for match in _TEMPLATE_VAR_RE.finditer(content)}
 
 
 class ObsidianConnector:
@@ -446,48 +643,120 @@ class ObsidianConnector:
         self.scanner = ObsidianVaultScanner(vault_path)
         self.template_engine = ObsidianTemplateEngine()
         self._note_cache = {}
+        # _note_cache's notes, newest first; sorted once per refresh for pagination
+        self._notes_by_modified: List[Dict[str, Any]] = []
+        # (note, lowercased content, lowercased title, lowercased tags) per note
+        self._search_index: List[Tuple[Dict[str, Any], str, str, List[str]]] = []
+        # Notes by lowercased name (first in path order wins) and by lowercased tag
+        self._notes_by_name: Dict[str, Dict[str, Any]] = {}
+        self._notes_by_tag: Dict[str, List[Dict[str, Any]]] = {}
+        # Lowercased link target -> backlink records, in source note order
+        self._backlinks: Dict[str, List[Dict[str, Any]]] = {}
+        # Note path -> block type -> (position, block) in document order; filled per
+        # note on first use
+        self._blocks_by_type: Dict[str, Dict[str, List[Tuple[int, Dict[str, Any]]]]] = {}
+        # Aggregates derived once per refresh
+        self._orphaned_notes: List[Dict[str, Any]] = []
+        self._vault_stats: Dict[str, Any] = {}
+        self._vault_signature = None
+        # Loaded from the on-disk index on first use
+        self._parsed_notes: Optional[ParsedNotes] = None
         self._cache_timestamp = None
 
+    def _ensure_note_cache(self, refresh: bool = False) -> None:
+        """Rebuild the note cache when forced, empty, or the vault's files changed."""
+        signature = self.scanner.get_vault_signature()
+        if refresh or not self._note_cache or signature != self._vault_signature:
+            self._refresh_note_cache(signature, reparse=refresh)
+            self._vault_signature = signature
+
     def get_notes(
         self, limit: int = None, offset: int = 0, refresh_cache: bool = False
     ) -> List[Dict[str, Any]]:
         """Get notes with optional pagination."""
-        if refresh_cache or not self._note_cache:
-            self._refresh_note_cache()
-
-        notes = list(self._note_cache.values())
-
-        # Sort by modification date (newest first)
-        notes.sort(key=lambda x: x["modified"], reverse=True)
+        self._ensure_note_cache(refresh_cache)
 
         # Apply pagination
         start_idx = offset
         end_idx = offset + limit if limit else None
 
-        return notes[start_idx:end_idx]
+        return self._notes_by_modified[start_idx:end_idx]
 
     def search_notes(
         self, query: str, search_in: List[str] = None, limit: int = None
     ) -> List[Dict[str, Any]]:
-        """Search notes with optional result limiting."""
-        results = self.scanner.search_notes(query, search_in)
+        """Search notes with optional result limiting.
 
-        if limit:
-            results = results[:limit]
+        Matching is case-insensitive against fields lowercased once per scan.
+        """
+        if search_in is None:
+            search_in = ["content", "title", "tags"]
+        in_content = "content" in search_in
+        in_title = "title" in search_in
+        in_tags = "tags" in search_in
+
+        self._ensure_note_cache()
+        query_lower = query.lower()
+        results = []
+
+        for note, content_lower, title_lower, tags_lower in self._search_index:
+            if (
+                (in_content and query_lower in content_lower)
+                or (in_title and query_lower in title_lower)
+                or (in_tags and any(query_lower in tag for tag in tags_lower))
+            ):
+                results.append(note)
+                if limit and len(results) >= limit:
+                    break
 
         return results
 
     def get_note_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """Get a specific note by name."""
-        return self.scanner.get_note_by_name(name)
+        """Get a specific note by name (case-insensitive)."""
+        self._ensure_note_cache()
+        return self._notes_by_name.get(name.lower())
 
     def get_notes_by_tag(self, tag: str) -> List[Dict[str, Any]]:
-        """Get all notes with a specific tag."""
-        return self.scanner.get_notes_by_tag(tag)
+        """Get all notes with a specific tag (case-insensitive)."""
+        self._ensure_note_cache()
+        return list(self._notes_by_tag.get(tag.lower(), []))
+
+    def get_note_blocks(
+        self, note: Dict[str, Any], block_types: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Return a note's blocks in document order, optionally only those of the
+        given types. Blocks are grouped by type once per note until the next refresh."""
+        if not block_types:
+            return list(note["blocks"])
+
+        by_type = self._blocks_by_type.get(note["path"])
+        if by_type is None:
+            by_type = {}
+            for position, block in enumerate(note["blocks"]):
+                by_type.setdefault(block["type"], []).append((position, block))
+            self._blocks_by_type[note["path"]] = by_type
+
+        selected = [by_type[block_type] for block_type in set(block_types) if block_type in by_type]
+        return [block for _, block in heapq.merge(*selected, key=itemgetter(0))]
+
+    def get_backlinks(self, note_name: str) -> List[Dict[str, Any]]:
+        """Find all notes that link to the specified note (case-insensitive)."""
+        self._ensure_note_cache()
+        return list(self._backlinks.get(note_name.lower(), []))
+
+    def get_orphaned_notes(self) -> List[Dict[str, Any]]:
+        """Find notes that have no incoming or outgoing links."""
+        self._ensure_note_cache()
+        return list(self._orphaned_notes)
 
     def get_vault_stats(self) -> Dict[str, Any]:
         """Get comprehensive vault statistics."""
-        return self.scanner.get_vault_stats()
+        self._ensure_note_cache()
+        return {
+            **self._vault_stats,
+            "all_tags": list(self._vault_stats["all_tags"]),
+            "note_types": dict(self._vault_stats["note_types"]),
+        }
 
     def extract_content_for_flashcards(
         self, note: Dict[str, Any], content_types: List[str] = None
@@ -512,68 +781,144 @@ class ObsidianConnector:
                         }
                     )
 
-        # Extract definition-like content
-        if "definitions" in content_types:
+        # Definitions, list items and quotes come from one pass over the blocks,
+        # kept in separate lists so the output stays grouped by type
+        want_definitions = "definitions" in content_types
+        want_lists = "lists" in content_types
+        want_quotes = "quotes" in content_types
+        definitions: List[Dict[str, Any]] = []
+        list_items: List[Dict[str, Any]] = []
+        quotes: List[Dict[str, Any]] = []
+        note_name = note["name"]
+
+        if want_definitions or want_lists or want_quotes:
             for block in note["blocks"]:
-                if block["type"] == "paragraph":
+                block_type = block["type"]
+
+                # Extract definition-like content
+                if block_type == "paragraph":
+                    if not want_definitions:
+                        continue
                     content = block["content"]
                     # Look for definition patterns
-                    if re.search(
-                        r"\b(is|are|means|refers to|defined as)\b", content, re.IGNORECASE
-                    ):
+                    if _DEFINITION_RE.search(content):
                         # Try to split into term and definition
-                        sentences = content.split(".")
-                        for sentence in sentences:
-                            if re.search(
-                                r"\b(is|are|means|refers to|defined as)\b", sentence, re.IGNORECASE
-                            ):
-                                flashcard_content.append(
+                        for sentence in content.split("."):
+                            if _DEFINITION_RE.search(sentence):
+                                definitions.append(
                                     {
                                         "type": "definition",
                                         "content": sentence.strip(),
-                                        "source_note": note["name"],
+                                        "source_note": note_name,
                                         "source_line": block["start_line"],
                                     }
                                 )
 
-        # Extract list items
-        if "lists" in content_types:
-            for block in note["blocks"]:
-                if block["type"] in ["list", "numbered_list"]:
-                    lines = block["content"].split("\n")
-                    for line in lines:
+                # Extract list items
+                elif block_type == "list" or block_type == "numbered_list":
+                    if not want_lists:
+                        continue
+                    for line in block["content"].split("\n"):
                         if line.strip():
-                            clean_line = re.sub(r"^\s*[-*+\d.]\s*", "", line)
+                            clean_line = _LIST_MARKER_RE.sub("", line)
                             if len(clean_line.split()) > 3:  # Only meaningful list items
-                                flashcard_content.append(
+                                list_items.append(
                                     {
                                         "type": "list_item",
                                         "content": clean_line,
-                                        "source_note": note["name"],
-                                        "context": f"Item from list in {note['name']}",
+                                        "source_note": note_name,
+                                        "context": f"Item from list in {note_name}",
                                     }
                                 )
 
-        # Extract quotes
-        if "quotes" in content_types:
-            for block in note["blocks"]:
-                if block["type"] == "quote":
-                    clean_quote = re.sub(r"^\s*>\s*", "", block["content"], flags=re.MULTILINE)
-                    flashcard_content.append(
+                # Extract quotes
+                elif block_type == "quote":
+                    if not want_quotes:
+                        continue
+                    quotes.append(
                         {
                             "type": "quote",
-                            "content": clean_quote,
-                            "source_note": note["name"],
+                            "content": _QUOTE_MARKER_RE.sub("", block["content"]),
+                            "source_note": note_name,
                             "source_line": block["start_line"],
                         }
                     )
 
+        flashcard_content.extend(definitions)
+        flashcard_content.extend(list_items)
+        flashcard_content.extend(quotes)
+
         return flashcard_content
 
-    def _refresh_note_cache(self):
-        """Refresh the internal note cache."""
-        notes = self.scanner.get_all_notes()
+    def _refresh_note_cache(self, signature: frozenset = None, reparse: bool = False):
+        """Refresh the internal note cache, parsing only new or changed files unless
+        ``reparse`` is set."""
+        if signature is None:
+            signature = self.scanner.get_vault_signature()
+        if reparse:
+            previous = {}
+        else:
+            if self._parsed_notes is None:
+                self._parsed_notes = _load_index_cache(self.vault_path)
+            previous = self._parsed_notes
+
+        parsed = self.scanner.parse_notes(signature, previous)
+        if parsed.keys() != previous.keys():
+            _save_index_cache(self.vault_path, parsed)
+        self._parsed_notes = parsed
+
+        notes = list(parsed.values())
         self._note_cache = {note["name"]: note for note in notes}
+        self._notes_by_modified = sorted(
+            self._note_cache.values(), key=lambda x: x["modified"], reverse=True
+        )
+        self._search_index = [
+            (
+                note,
+                note["content"].lower(),
+                str(note["title"]).lower(),
+                [tag.lower() for tag in note["tags"]],
+            )
+            for note in notes
+        ]
+
+        self._notes_by_name = {}
+        self._notes_by_tag = {}
+        self._backlinks = {}
+        self._blocks_by_type = {}
+        for note in notes:
+            self._notes_by_name.setdefault(note["name"].lower(), note)
+            for tag in {tag.lower() for tag in note["tags"]}:
+                self._notes_by_tag.setdefault(tag, []).append(note)
+            for link in note["wikilinks"]:
+                self._backlinks.setdefault(link["target"].lower(), []).append(
+                    {
+                        "source_note": note["name"],
+                        "source_path": note["path"],
+                        "link_text": link["display"],
+                        "header": link["header"],
+                    }
+                )
+
+        self._orphaned_notes = [
+            note
+            for note in notes
+            if not note["wikilinks"] and note["name"].lower() not in self._backlinks
+        ]
+        all_tags = set()
+        note_types: Dict[str, int] = {}
+        for note in notes:
+            all_tags.update(note["tags"])
+            note_type = note["frontmatter"].get("type", "note")
+            note_types[note_type] = note_types.get(note_type, 0) + 1
+        self._vault_stats = {
+            "total_notes": len(notes),
+            "total_size_bytes": sum(note["size"] for note in notes),
+            "total_tags": len(all_tags),
+            "all_tags": sorted(all_tags),
+            "note_types": note_types,
+            "vault_path": str(self.scanner.vault_path),
+        }
         self._cache_timestamp = datetime.now()
 
     def is_available(self) -> bool:
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 import requests
 
-from mcp_server_learning.fastmcp_flashcard_server import AnkiConnector
+from mcp_server_learning.fastmcp_flashcard_server import AnkiConnector, _env_batch_size
 
 
 class TestAnkiConnectivity:
@@ -315,6 +315,92 @@ class TestAnkiConnectivity:
 
         assert "AnkiConnect error: deck was not found" in str(exc_info.value)
 
+    @patch("requests.Session.post")
+    def test_move_notes_to_deck_success(self, mock_post):
+        """Test move_notes_to_deck resolves card IDs then changes deck."""
+        mock_post.side_effect = [
+            Mock(
+                json=lambda: {"result": [456, 457], "error": None},
+                raise_for_status=lambda: None,
+            ),
+            Mock(
+                json=lambda: {"result": None, "error": None},
+                raise_for_status=lambda: None,
+            ),
+        ]
+
+        card_ids = self.anki_connector.move_notes_to_deck([123, 124], "Target")
+
+        assert card_ids == [456, 457]
+        calls = mock_post.call_args_list
+        assert calls[0][1]["json"]["action"] == "findCards"
+        assert calls[0][1]["json"]["params"] == {"query": "nid:123,124"}
+        assert calls[1][1]["json"]["action"] == "changeDeck"
+        assert calls[1][1]["json"]["params"] == {"cards": [456, 457], "deck": "Target"}
+
+    @patch("requests.Session.post")
+    def test_move_notes_to_deck_no_cards(self, mock_post):
+        """Test move_notes_to_deck skips changeDeck when there are no cards."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"result": [], "error": None}
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+
+        assert self.anki_connector.move_notes_to_deck([123], "Target") == []
+        assert mock_post.call_count == 1
+
+    @patch("requests.Session.post")
+    def test_multi_batches_actions(self, mock_post):
+        """Test multi sends all actions in one request."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "result": [{"result": None, "error": None}, {"result": None, "error": None}],
+            "error": None,
+        }
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+
+        results = self.anki_connector.multi(
+            [{"action": "deckNames"}, {"action": "createDeck", "params": {"deck": "X"}}]
+        )
+
+        assert len(results) == 2
+        mock_post.assert_called_once()
+        payload = mock_post.call_args[1]["json"]
+        assert payload["action"] == "multi"
+        assert [a["action"] for a in payload["params"]["actions"]] == ["deckNames", "createDeck"]
+
+    @patch("requests.Session.post")
+    def test_notes_info_cached_until_write(self, mock_post):
+        """Test repeated reads hit the cache and writes invalidate it."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"result": [{"noteId": 123}], "error": None}
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+
+        self.anki_connector.notes_info([123])
+        self.anki_connector.notes_info([123])
+        assert mock_post.call_count == 1
+
+        self.anki_connector.delete_notes([999])
+        self.anki_connector.notes_info([123])
+        assert mock_post.call_count == 3
+
+    @patch("requests.Session.post")
+    def test_cached_reads_are_copies(self, mock_post):
+        """Test mutating a cached result does not change later cache hits."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"result": [{"noteId": 123}], "error": None}
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+
+        first = self.anki_connector.notes_info([123])
+        first[0]["noteId"] = 999
+        first.append({"noteId": 1})
+
+        assert self.anki_connector.notes_info([123]) == [{"noteId": 123}]
+        assert mock_post.call_count == 1
+
     @patch("requests.Session.post")
     def test_get_card_ids_from_notes_success(self, mock_post):
         """Test successful extraction of card IDs from notes."""
@@ -501,6 +587,14 @@ class TestAnkiConnectivity:
         assert calls[2][1]["json"]["action"] == "setSpecificValueOfCard"
         assert calls[2][1]["json"]["params"]["cards"] == card_ids
 
+    @patch("requests.Session.post")
+    def test_add_notes_empty_skips_request(self, mock_post):
+        """Test add_notes with no notes returns without calling AnkiConnect."""
+        result = self.anki_connector.add_notes([])
+
+        assert result == []
+        mock_post.assert_not_called()
+
     @patch("requests.Session.post")
     def test_update_note_with_purple_flag(self, mock_post):
         """Test update_note automatically reapplies purple flag."""
@@ -539,6 +633,138 @@ class TestAnkiConnectivity:
         assert calls[2][1]["json"]["action"] == "setSpecificValueOfCard"
         assert calls[2][1]["json"]["params"]["cards"] == card_ids
 
+    @staticmethod
+    def _anki_reply(result):
+        return Mock(json=lambda: {"result": result, "error": None}, raise_for_status=lambda: None)
+
+    @patch("requests.Session.post")
+    def test_update_notes_skips_notes_already_up_to_date(self, mock_post):
+        """Test updates matching the note's current content in Anki are not written."""
+        current = [
+            {"noteId": 123, "fields": {"Front": {"value": "Q", "order": 0}}, "tags": ["b", "a"]},
+            {"noteId": 124, "fields": {"Front": {"value": "old", "order": 0}}, "tags": []},
+        ]
+        mock_post.side_effect = [
+            self._anki_reply(current),
+            self._anki_reply([{"result": None, "error": None}]),
+            self._anki_reply([{"noteId": 124, "cards": [9]}]),
+            self._anki_reply(None),
+        ]
+
+        results = self.anki_connector.update_notes(
+            [
+                {"note_id": 123, "fields": {"Front": "Q"}, "tags": ["a", "b"]},
+                {"note_id": 124, "fields": {"Front": "new"}},
+            ]
+        )
+
+        assert [r["changed"] for r in results] == [False, True]
+        multi = mock_post.call_args_list[1][1]["json"]
+        assert multi["action"] == "multi"
+        assert [a["params"]["note"]["id"] for a in multi["params"]["actions"]] == [124]
+
+    @patch("requests.Session.post")
+    def test_update_notes_rewrites_notes_edited_in_anki(self, mock_post):
+        """Test resubmitting content is written again after the note was edited elsewhere."""
+        update = [{"note_id": 123, "fields": {"Front": "Q"}}]
+        edited = [{"noteId": 123, "fields": {"Front": {"value": "GUI edit", "order": 0}}}]
+        written = [{"noteId": 123, "fields": {"Front": {"value": "Q", "order": 0}}}]
+        mock_post.side_effect = [
+            self._anki_reply(written),
+            self._anki_reply(edited),
+            self._anki_reply([{"result": None, "error": None}]),
+            self._anki_reply([]),
+        ]
+
+        assert self.anki_connector.update_notes(update)[0]["changed"] is False
+        assert self.anki_connector.update_notes(update)[0]["changed"] is True
+        actions = [c[1]["json"]["action"] for c in mock_post.call_args_list]
+        assert actions == ["notesInfo", "notesInfo", "multi", "notesInfo"]
+
+    @patch("requests.Session.post")
+    def test_update_notes_batches_into_multi(self, mock_post):
+        """Test update_notes sends all field/tag updates in one multi request."""
+        mock_responses = [
+            # First: notesInfo for the current content
+            Mock(
+                json=lambda: {"result": [{"noteId": 123, "cards": [456]}, {}], "error": None},
+                raise_for_status=lambda: None,
+            ),
+            # Second: multi
+            Mock(
+                json=lambda: {
+                    "result": [
+                        {"result": None, "error": None},
+                        {"result": None, "error": None},
+                        {"result": None, "error": "note was not found: 124"},
+                    ],
+                    "error": None,
+                },
+                raise_for_status=lambda: None,
+            ),
+            # Third: notesInfo for the written cards
+            Mock(
+                json=lambda: {"result": [{"noteId": 123, "cards": [456]}], "error": None},
+                raise_for_status=lambda: None,
+            ),
+            # Fourth: setSpecificValueOfCard
+            Mock(
+                json=lambda: {"result": None, "error": None},
+                raise_for_status=lambda: None,
+            ),
+        ]
+        mock_post.side_effect = mock_responses
+
+        results = self.anki_connector.update_notes(
+            [
+                {"note_id": 123, "fields": {"Front": "Q"}, "tags": ["t"]},
+                {"note_id": 124, "fields": {"Front": "Q2"}},
+            ]
+        )
+
+        assert results[0] == {"note_id": 123, "changed": True, "error": None}
+        assert results[1]["changed"] is False
+        assert "note was not found" in results[1]["error"]
+
+        calls = mock_post.call_args_list
+        assert calls[1][1]["json"]["action"] == "multi"
+        actions = [a["action"] for a in calls[1][1]["json"]["params"]["actions"]]
+        assert actions == ["updateNoteFields", "updateNoteTags", "updateNoteFields"]
+        assert calls[3][1]["json"]["params"]["cards"] == [456]
+
+    @patch("mcp_server_learning.fastmcp_flashcard_server._ANKI_BATCH_SIZE", 2)
+    @patch("requests.Session.post")
+    def test_delete_notes_batched_preserves_partial_progress(self, mock_post):
+        """Test batched delete stops at the first failed chunk and reports partial progress."""
+        ok = Mock(json=lambda: {"result": None, "error": None}, raise_for_status=lambda: None)
+        mock_post.side_effect = [ok, requests.exceptions.ReadTimeout(), ok]
+
+        deleted, error = self.anki_connector.delete_notes_batched([1, 2, 3, 4, 5])
+
+        assert deleted == [1, 2]
+        assert "timed out" in error
+        # A write the server may have received is never replayed
+        chunks = [c[1]["json"]["params"]["notes"] for c in mock_post.call_args_list]
+        assert chunks == [[1, 2], [3, 4]]
+
+    def test_session_retries_only_refused_connections(self):
+        """Test the adapter retries failed connects but never a sent request."""
+        retries = self.anki_connector.session.get_adapter("http://localhost:8765").max_retries
+        assert retries.total == 3
+        assert retries.read == 0
+        assert retries.other == 0
+        assert retries.status == 0
+        assert not retries.status_forcelist
+
+    def test_batch_size_env_falls_back_on_invalid_value(self, monkeypatch):
+        """Test a non-integer MCP_ANKI_BATCH_SIZE falls back to the default."""
+        monkeypatch.setenv("MCP_ANKI_BATCH_SIZE", "lots")
+        assert _env_batch_size() == 50
+        monkeypatch.setenv("MCP_ANKI_BATCH_SIZE", "0")
+        assert _env_batch_size() == 1
+        monkeypatch.setenv("MCP_ANKI_BATCH_SIZE", "20")
+        assert _env_batch_size() == 20
+
 
 class TestAnkiConnectivityIntegration:
     """Integration tests for actual Anki Connect connectivity.
@@ -834,6 +1060,22 @@ class TestAnkiConnectivityConfig:
         call_args = mock_post.call_args
         assert call_args[1]["timeout"] == 10
 
+    def test_session_uses_pooled_keep_alive_adapter(self):
+        """Test the connector session mounts a pooled, retrying HTTP adapter."""
+        connector = AnkiConnector()
+        adapter = connector.session.get_adapter(connector.url)
+
+        assert adapter.max_retries.total == 3
+        assert connector.session.headers["Connection"] == "keep-alive"
+
+    def test_get_anki_connector_reuses_instance_per_key(self):
+        """Test get_anki_connector returns one connector per API key."""
+        from mcp_server_learning.fastmcp_flashcard_server import get_anki_connector
+
+        assert get_anki_connector("key-a") is get_anki_connector("key-a")
+        assert get_anki_connector("key-a") is not get_anki_connector("key-b")
+        assert get_anki_connector() is get_anki_connector(None)
+
 
 if __name__ == "__main__":
     # Run the tests
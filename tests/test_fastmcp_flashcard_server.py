@@ -79,6 +79,19 @@ class TestFlashcardGenerator:
         assert "{{c1::France}}" in cards[0]["text"]
         assert "{{c2::Paris}}" in cards[0]["text"]
 
+    def test_detect_card_type(self):
+        """Test card type detection picks the first marker found."""
+        assert FlashcardGenerator.detect_card_type("Q: What?\nA: That") == "front-back"
+        assert FlashcardGenerator.detect_card_type("The answer is {{42}}.") == "cloze"
+        assert FlashcardGenerator.detect_card_type("Plain text") == "front-back"
+
+    def test_parse_text_to_cards_auto(self):
+        """Test auto card type dispatches to the cloze parser."""
+        cards = FlashcardGenerator.parse_text_to_cards("The answer is {{42}}.", "auto")
+
+        assert len(cards) == 1
+        assert "{{c1::42}}" in cards[0]["text"]
+
     def test_create_anki_cloze_card(self):
         """Test cloze card creation."""
         text = "The answer is {{42}}."
@@ -167,6 +180,27 @@ class TestFlashcardMCPTools:
         assert len(result["data"]["cards"]) == 1
         assert result["data"]["card_type"] == "cloze"
 
+    def test_create_flashcards_auto_reports_resolved_type(self):
+        """Test create_flashcards reports the card type that "auto" resolved to."""
+        result = flashcard_server.create_cards.fn("The answer is {{42}}.", card_type="auto")
+
+        assert result["success"] is True
+        assert result["data"]["card_type"] == "cloze"
+
+    @patch("mcp_server_learning.fastmcp_flashcard_server.get_anki_connector")
+    def test_upload_cards_auto_uses_parsed_card_type(self, _mock_connector):
+        """Test upload_cards with "auto" uploads cloze content as cloze cards."""
+        with patch.object(
+            AnkiCardManager,
+            "upload_cards_to_anki",
+            return_value={"success": True, "successful_uploads": 1, "deck_name": "D"},
+        ) as mock_upload:
+            result = flashcard_server.upload_cards.fn("The answer is {{42}}.", "D", "auto")
+
+        assert result["success"] is True
+        cards_data = mock_upload.call_args[0][0]
+        assert [c["card_type"] for c in cards_data] == ["cloze"]
+
     def test_preview_cards_tool(self):
         """Test preview_cards tool function."""
         content = "Q: Question?\nA: Answer"
@@ -211,19 +245,8 @@ class TestFlashcardMCPTools:
     @patch.object(AnkiConnector, "_make_request")
     def test_move_notes_to_deck_success(self, mock_request):
         """Test move_notes_to_deck tool function."""
-        # Mock notes_info response
-        mock_notes_info = [
-            {
-                "noteId": 123,
-                "cards": [456, 457],
-            },
-            {
-                "noteId": 124,
-                "cards": [458],
-            },
-        ]
-        # Mock changeDeck response
-        mock_request.side_effect = [mock_notes_info, None]
+        # Mock findCards then changeDeck responses
+        mock_request.side_effect = [[456, 457, 458], None]
 
         result = flashcard_server.move_to_deck.fn([123, 124], "New Deck")
 
@@ -236,14 +259,8 @@ class TestFlashcardMCPTools:
     @patch.object(AnkiConnector, "_make_request")
     def test_move_notes_to_deck_no_cards(self, mock_request):
         """Test move_notes_to_deck when notes have no cards."""
-        # Mock notes_info response with no cards
-        mock_notes_info = [
-            {
-                "noteId": 123,
-                "cards": [],
-            },
-        ]
-        mock_request.return_value = mock_notes_info
+        # Mock findCards response with no cards
+        mock_request.return_value = []
 
         result = flashcard_server.move_to_deck.fn([123], "New Deck")
 
@@ -254,7 +271,6 @@ class TestFlashcardMCPTools:
     @patch.object(AnkiConnector, "_make_request")
     def test_move_notes_to_deck_empty_note_list(self, mock_request):
         """Test move_notes_to_deck with empty note list."""
-        # Mock notes_info response with empty list
         mock_request.return_value = []
 
         result = flashcard_server.move_to_deck.fn([], "New Deck")
@@ -265,13 +281,7 @@ class TestFlashcardMCPTools:
     @patch.object(AnkiConnector, "_make_request")
     def test_move_notes_to_deck_single_note(self, mock_request):
         """Test move_notes_to_deck with single note."""
-        mock_notes_info = [
-            {
-                "noteId": 123,
-                "cards": [456],
-            },
-        ]
-        mock_request.side_effect = [mock_notes_info, None]
+        mock_request.side_effect = [[456], None]
 
         result = flashcard_server.move_to_deck.fn([123], "Target Deck")
 
@@ -337,6 +347,15 @@ class TestAnkiCardManager:
         assert result["success"] is True
         assert result["successful_uploads"] == 1
 
+    def test_upload_cards_empty_skips_anki(self, mock_manager):
+        """Test uploading no cards does not touch AnkiConnect."""
+        result = mock_manager.upload_cards_to_anki([], "Test Deck")
+
+        assert result["success"] is False
+        assert result["total_cards"] == 0
+        mock_manager.anki.check_permission.assert_not_called()
+        mock_manager.anki.create_deck.assert_not_called()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from mcp_server_learning import fastmcp_learning_suite_server as suite_server
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+
+# Runs in a fresh interpreter so modules imported by other tests do not leak in
+_SUITE_PROBE = """
+import asyncio, json, sys
+from mcp_server_learning.fastmcp_learning_suite_server import build_suite
+
+tools = asyncio.run(build_suite().get_tools())
+print(json.dumps({
+    "prefixes": sorted({name.split("_", 1)[0] for name in tools}),
+    "modules": sorted(m for m in sys.modules if m.startswith("mcp_server_learning.")),
+}))
+"""
+
+
+def _probe_suite(enable):
+    env = dict(os.environ, PYTHONPATH=str(SRC_PATH), MCP_SUITE_ENABLE=enable)
+    completed = subprocess.run(
+        [sys.executable, "-c", _SUITE_PROBE],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+        timeout=120,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_suite_enable_mounts_only_listed_servers():
+    """Test MCP_SUITE_ENABLE registers only the listed servers' tools."""
+    result = _probe_suite("flashcard, math")
+
+    assert result["prefixes"] == ["flashcard", "math"]
+    assert "mcp_server_learning.fastmcp_flashcard_server" in result["modules"]
+    assert "mcp_server_learning.fastmcp_math_verification_server" in result["modules"]
+
+
+def test_suite_enable_never_imports_disabled_servers():
+    """Test disabled servers' modules are not imported at all."""
+    result = _probe_suite("flashcard,math")
+
+    assert not any("obsidian" in name or "zotero" in name for name in result["modules"])
+
+
+def test_enabled_prefixes_parsing(monkeypatch):
+    """Test MCP_SUITE_ENABLE parsing ignores blanks and defaults to all servers."""
+    monkeypatch.setenv("MCP_SUITE_ENABLE", " flashcard, ,math ")
+    assert suite_server._enabled_prefixes() == {"flashcard", "math"}
+
+    monkeypatch.setenv("MCP_SUITE_ENABLE", "")
+    assert suite_server._enabled_prefixes() is None
+
+
+def test_mounting_twice_is_a_noop(monkeypatch):
+    """Test a second _mount_suite call does not register the tools again."""
+    monkeypatch.setenv("MCP_SUITE_ENABLE", "math")
+    suite = suite_server.build_suite()
+    tools_before = asyncio.run(suite.get_tools())
+
+    mounted = []
+    monkeypatch.setattr(suite, "mount", lambda *args, **kwargs: mounted.append(args))
+    suite_server._mount_suite(suite)
+
+    assert mounted == []
+    assert asyncio.run(suite.get_tools()).keys() == tools_before.keys()
@@ -1,32 +1,43 @@
 import os
-import types
 
 import pytest
 
 # Import the tool functions to call directly
 from mcp_server_learning import fastmcp_obsidian_server as obs_server
+from mcp_server_learning import obsidian_connector
+
+
+@pytest.fixture(autouse=True)
+def index_cache_dir(tmp_path, monkeypatch):
+    """Keep persisted vault indexes out of the user's cache directory."""
+    cache_dir = tmp_path / "index-cache"
+    monkeypatch.setattr(obsidian_connector, "_INDEX_CACHE_DIR", cache_dir)
+    return cache_dir
 
 
 class DummyConnector:
-    def __init__(self):
-        self.scanner = types.SimpleNamespace(
-            get_backlinks=lambda note: [
-                {
-                    "source_note": "NoteA",
-                    "source_path": "A.md",
-                    "link_text": "A -> B",
-                    "header": None,
-                }
-            ],
-            get_orphaned_notes=lambda: [
-                {
-                    "title": "Lonely",
-                    "path": "Lonely.md",
-                    "modified": "2024-01-01T00:00:00",
-                    "size": 10,
-                }
-            ],
-        )
+    def get_backlinks(self, note_name):
+        return [
+            {
+                "source_note": "NoteA",
+                "source_path": "A.md",
+                "link_text": "A -> B",
+                "header": None,
+            }
+        ]
+
+    def get_note_blocks(self, note, block_types=None):
+        return [b for b in note["blocks"] if not block_types or b["type"] in block_types]
+
+    def get_orphaned_notes(self):
+        return [
+            {
+                "title": "Lonely",
+                "path": "Lonely.md",
+                "modified": "2024-01-01T00:00:00",
+                "size": 10,
+            }
+        ]
 
     def get_vault_stats(self):
         return {
@@ -112,6 +123,21 @@ def test_missing_env_raises(monkeypatch):
         obs_server._get_connector()
 
 
+def test_connector_is_reused_per_vault(monkeypatch, tmp_path):
+    monkeypatch.setattr(obs_server, "_connectors", {})
+    vault_a = tmp_path / "a"
+    vault_b = tmp_path / "b"
+    vault_a.mkdir()
+    vault_b.mkdir()
+
+    monkeypatch.setenv("OBSIDIAN_VAULT_PATH", str(vault_a))
+    first = obs_server._get_connector()
+    assert obs_server._get_connector() is first
+
+    monkeypatch.setenv("OBSIDIAN_VAULT_PATH", str(vault_b))
+    assert obs_server._get_connector() is not first
+
+
 def test_list_vault_notes(monkeypatch):
     monkeypatch.setenv("OBSIDIAN_VAULT_PATH", "/tmp/vault")
     monkeypatch.setattr(obs_server, "_get_connector", lambda: DummyConnector())
@@ -212,11 +238,11 @@ def test_get_note_backlinks_no_results(monkeypatch):
     monkeypatch.setenv("OBSIDIAN_VAULT_PATH", "/tmp/vault")
 
     class NoBacklinksConnector(DummyConnector):
-        def __init__(self):
-            self.scanner = types.SimpleNamespace(
-                get_backlinks=lambda note: [],
-                get_orphaned_notes=lambda: [],
-            )
+        def get_backlinks(self, note_name):
+            return []
+
+        def get_orphaned_notes(self):
+            return []
 
     monkeypatch.setattr(obs_server, "_get_connector", lambda: NoBacklinksConnector())
     result = obs_server.get_backlinks.fn("NoteB")
@@ -242,11 +268,11 @@ def test_get_orphaned_notes_none(monkeypatch):
     monkeypatch.setenv("OBSIDIAN_VAULT_PATH", "/tmp/vault")
 
     class NoOrphansConnector(DummyConnector):
-        def __init__(self):
-            self.scanner = types.SimpleNamespace(
-                get_backlinks=lambda note: [],
-                get_orphaned_notes=lambda: [],
-            )
+        def get_backlinks(self, note_name):
+            return []
+
+        def get_orphaned_notes(self):
+            return []
 
     monkeypatch.setattr(obs_server, "_get_connector", lambda: NoOrphansConnector())
     result = obs_server.get_orphaned_notes.fn()
@@ -466,6 +492,17 @@ def test_get_notes_for_flashcards_by_names(monkeypatch):
     assert len(result["data"]) >= 1
 
 
+def test_get_notes_for_flashcards_skips_repeated_names(monkeypatch):
+    """Test a note named more than once is only extracted once."""
+    monkeypatch.setenv("OBSIDIAN_VAULT_PATH", "/tmp/vault")
+    monkeypatch.setattr(obs_server, "_get_connector", lambda: DummyConnector())
+    result = obs_server.get_flashcard_content.fn(note_names=["exists", "exists", "missing"])
+
+    assert result["success"] is True
+    assert len(result["data"]) == 1
+    assert "from 1 note(s)" in result["message"]
+
+
 def test_get_notes_for_flashcards_missing_params(monkeypatch):
     """Test get_notes_for_flashcards requires note_names or tag_filter."""
     monkeypatch.setenv("OBSIDIAN_VAULT_PATH", "/tmp/vault")
@@ -474,3 +511,258 @@ def test_get_notes_for_flashcards_missing_params(monkeypatch):
 
     assert result["success"] is False
     assert "must be provided" in result["message"]
+
+
+def test_connector_search_uses_cached_index(tmp_path):
+    """Test connector search is case-insensitive and picks up vault changes."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector
+
+    (tmp_path / "Calculus.md").write_text("---\ntags: [Math]\n---\nThe Derivative of x")
+    (tmp_path / "History.md").write_text("Rome was not built in a day")
+    connector = ObsidianConnector(str(tmp_path))
+
+    assert [n["name"] for n in connector.search_notes("derivative")] == ["Calculus"]
+    assert [n["name"] for n in connector.search_notes("math", ["tags"])] == ["Calculus"]
+    assert connector.search_notes("calculus", ["content"]) == []
+    assert len(connector.search_notes("a", limit=1)) == 1
+
+    (tmp_path / "Algebra.md").write_text("A matrix has a DERIVATIVE too")
+    assert {n["name"] for n in connector.search_notes("derivative")} == {"Calculus", "Algebra"}
+
+
+def test_connector_search_matches_substrings(tmp_path):
+    """Test search matches substrings within and across words."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector
+
+    (tmp_path / "Calculus.md").write_text("The derivative of x^2 is 2x.")
+    (tmp_path / "History.md").write_text("Rome was not built in a day?")
+    connector = ObsidianConnector(str(tmp_path))
+
+    assert [n["name"] for n in connector.search_notes("eriv")] == ["Calculus"]
+    assert [n["name"] for n in connector.search_notes("ive of x^")] == ["Calculus"]
+    assert [n["name"] for n in connector.search_notes("was not")] == ["History"]
+    assert connector.search_notes("built was") == []
+    assert connector.search_notes("zebra") == []
+    assert [n["name"] for n in connector.search_notes("?")] == ["History"]
+    assert [n["name"] for n in connector.search_notes("hist", ["title"])] == ["History"]
+
+
+def test_extract_content_for_flashcards_groups_by_type(tmp_path):
+    """Test extracted content is grouped by type regardless of block order."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector
+
+    (tmp_path / "Note.md").write_text(
+        "# Topic\n\n"
+        "> Quoted wisdom\n\n"
+        "- first item has enough words\n\n"
+        "A vector is an element of a vector space. Nothing here.\n"
+    )
+    connector = ObsidianConnector(str(tmp_path))
+    note = connector.get_note_by_name("Note")
+
+    content = connector.extract_content_for_flashcards(note)
+
+    assert [c["type"] for c in content] == ["header", "definition", "list_item", "quote"]
+    assert content[1]["content"] == "A vector is an element of a vector space"
+    assert content[2]["content"] == "first item has enough words"
+    assert content[3]["content"] == "Quoted wisdom"
+    assert connector.extract_content_for_flashcards(note, ["quotes"]) == [content[3]]
+
+
+def test_connector_index_persists_across_restarts(tmp_path, monkeypatch, index_cache_dir):
+    """Test a new connector loads parsed notes from disk and re-parses only changed files."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector, ObsidianVaultScanner
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "Calculus.md").write_text("The derivative of x")
+    (vault / "History.md").write_text("Rome was not built in a day")
+    assert len(ObsidianConnector(str(vault)).get_notes()) == 2
+    assert list(index_cache_dir.glob("obsidian-index-*.pickle"))
+
+    parsed = []
+    original_parse_note = ObsidianVaultScanner.parse_note
+
+    def counting_parse_note(self, file_path):
+        parsed.append(file_path.name)
+        return original_parse_note(self, file_path)
+
+    monkeypatch.setattr(ObsidianVaultScanner, "parse_note", counting_parse_note)
+
+    restarted = ObsidianConnector(str(vault))
+    assert [n["name"] for n in restarted.search_notes("derivative")] == ["Calculus"]
+    assert parsed == []
+
+    (vault / "History.md").write_text("Rome fell, and so did its derivative")
+    assert {n["name"] for n in restarted.search_notes("derivative")} == {"Calculus", "History"}
+    assert parsed == ["History.md"]
+
+    restarted.get_notes(refresh_cache=True)
+    assert sorted(parsed) == ["Calculus.md", "History.md", "History.md"]
+
+
+def test_vault_scan_walks_subfolders_and_skips_obsidian_folder(tmp_path):
+    """Test nested notes are found while .obsidian and non-markdown files are skipped."""
+    from mcp_server_learning.obsidian_connector import ObsidianVaultScanner
+
+    (tmp_path / "Top.md").write_text("top")
+    (tmp_path / "sub" / "deeper").mkdir(parents=True)
+    (tmp_path / "sub" / "deeper" / "Nested.md").write_text("nested")
+    (tmp_path / "sub" / "image.png").write_text("not a note")
+    (tmp_path / ".obsidian").mkdir()
+    (tmp_path / ".obsidian" / "Config.md").write_text("settings")
+    scanner = ObsidianVaultScanner(str(tmp_path))
+
+    assert sorted(n["name"] for n in scanner.get_all_notes()) == ["Nested", "Top"]
+    signature = scanner.get_vault_signature()
+    assert {os.path.basename(path) for path, _, _ in signature} == {"Nested.md", "Top.md"}
+    assert (str(tmp_path / "Top.md"), (tmp_path / "Top.md").stat().st_mtime_ns, 3) in signature
+
+
+def test_connector_name_and_tag_lookups_use_cached_maps(tmp_path, monkeypatch):
+    """Test name and tag lookups are case-insensitive and answered without re-parsing."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector, ObsidianVaultScanner
+
+    (tmp_path / "Calculus.md").write_text("---\ntags: [Math, math]\n---\nLimits #analysis")
+    (tmp_path / "Algebra.md").write_text("---\ntags: [MATH]\n---\nGroups")
+    connector = ObsidianConnector(str(tmp_path))
+    connector.get_notes()
+
+    monkeypatch.setattr(ObsidianVaultScanner, "parse_note", None)
+
+    assert connector.get_note_by_name("calculus")["name"] == "Calculus"
+    assert connector.get_note_by_name("Missing") is None
+    assert [n["name"] for n in connector.get_notes_by_tag("Math")] == ["Algebra", "Calculus"]
+    assert [n["name"] for n in connector.get_notes_by_tag("ANALYSIS")] == ["Calculus"]
+    assert connector.get_notes_by_tag("physics") == []
+
+
+def test_connector_backlinks_and_orphans_use_link_index(tmp_path, monkeypatch):
+    """Test backlinks and orphans come from the reverse link index built at refresh."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector, ObsidianVaultScanner
+
+    (tmp_path / "A.md").write_text("See [[b#Proof|the proof]] and [[C]]")
+    (tmp_path / "B.md").write_text("Back to [[A]]")
+    (tmp_path / "C.md").write_text("No links here")
+    (tmp_path / "Lonely.md").write_text("Nothing")
+    connector = ObsidianConnector(str(tmp_path))
+    connector.get_notes()
+
+    monkeypatch.setattr(ObsidianVaultScanner, "parse_note", None)
+
+    assert connector.get_backlinks("B") == [
+        {"source_note": "A", "source_path": "A.md", "link_text": "the proof", "header": "Proof"}
+    ]
+    assert [b["source_note"] for b in connector.get_backlinks("a")] == ["B"]
+    assert connector.get_backlinks("Lonely") == []
+    assert [n["name"] for n in connector.get_orphaned_notes()] == ["Lonely"]
+
+
+def test_connector_vault_stats_are_aggregated_at_refresh(tmp_path, monkeypatch):
+    """Test vault stats are computed once per refresh and match the scanner's."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector, ObsidianVaultScanner
+
+    (tmp_path / "A.md").write_text("---\ntype: concept\ntags: [math]\n---\nBody #proof")
+    (tmp_path / "B.md").write_text("Plain #math")
+    connector = ObsidianConnector(str(tmp_path))
+    expected = connector.scanner.get_vault_stats()
+    connector.get_notes()
+
+    monkeypatch.setattr(ObsidianVaultScanner, "parse_note", None)
+
+    stats = connector.get_vault_stats()
+    assert stats == expected
+    assert stats["all_tags"] == ["math", "proof"]
+    assert stats["note_types"] == {"concept": 1, "note": 1}
+
+    stats["all_tags"].append("mutated")
+    assert connector.get_vault_stats()["all_tags"] == ["math", "proof"]
+
+
+def test_vault_scan_parses_in_worker_processes(tmp_path, monkeypatch):
+    """Test pooled parsing of many changed notes matches serial parsing."""
+    from mcp_server_learning.obsidian_connector import ObsidianVaultScanner
+
+    for name in ("A", "B", "C"):
+        (tmp_path / f"{name}.md").write_text(f"---\ntags: [t{name}]\n---\n# {name}\n[[A]]")
+    (tmp_path / "Broken.md").write_bytes(b"\xff\xfe not utf-8")
+    scanner = ObsidianVaultScanner(str(tmp_path))
+    signature = scanner.get_vault_signature()
+    serial = scanner.parse_notes(signature, {})
+
+    monkeypatch.setattr(obsidian_connector, "_PARSE_WORKERS", 2)
+    monkeypatch.setattr(obsidian_connector, "_PARALLEL_MIN_NOTES", 2)
+    pooled = scanner.parse_notes(signature, {})
+
+    assert pooled == serial
+    assert sorted(note["name"] for note in pooled.values()) == ["A", "B", "C"]
+
+
+def test_invalid_parse_workers_setting_falls_back(monkeypatch):
+    """Test a malformed MCP_PARSE_WORKERS falls back to the CPU-based default."""
+    monkeypatch.setenv("MCP_PARSE_WORKERS", "many")
+    assert obsidian_connector._env_parse_workers() == min(4, os.cpu_count() or 1)
+    monkeypatch.setenv("MCP_PARSE_WORKERS", "2")
+    assert obsidian_connector._env_parse_workers() == 2
+
+
+def test_parse_frontmatter_types_and_invalid_yaml():
+    """Test frontmatter keeps YAML types and falls back on invalid YAML."""
+    import datetime
+
+    from mcp_server_learning.obsidian_connector import ObsidianMarkdownParser
+
+    frontmatter, body = ObsidianMarkdownParser.parse_frontmatter(
+        "---\ncreated: 2024-01-02\ntags: [a, b]\n---\nBody"
+    )
+    assert frontmatter == {"created": datetime.date(2024, 1, 2), "tags": ["a", "b"]}
+    assert body == "Body"
+
+    content = "---\nkey: [unclosed\n---\nBody"
+    assert ObsidianMarkdownParser.parse_frontmatter(content) == ({}, content)
+
+
+def test_connector_get_notes_paginates_presorted_notes(tmp_path):
+    """Test pagination slices notes sorted newest first without re-sorting per call."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector
+
+    for age, name in enumerate(["New", "Mid", "Old"]):
+        path = tmp_path / f"{name}.md"
+        path.write_text(name)
+        os.utime(path, (1_700_000_000 - age * 60, 1_700_000_000 - age * 60))
+    connector = ObsidianConnector(str(tmp_path))
+
+    assert [n["name"] for n in connector.get_notes()] == ["New", "Mid", "Old"]
+    page = connector.get_notes(limit=1, offset=1)
+    assert [n["name"] for n in page] == ["Mid"]
+
+    page.clear()
+    assert [n["name"] for n in connector.get_notes(offset=2)] == ["Old"]
+
+
+def test_extract_tags_interns_tag_strings():
+    """Test equal tags from different notes are the same string object."""
+    from mcp_server_learning.obsidian_connector import ObsidianMarkdownParser
+
+    first = ObsidianMarkdownParser.extract_tags("Text #calc" + "ulus", {"tags": ["lin" + "alg"]})
+    second = ObsidianMarkdownParser.extract_tags("More #calculus", {"tags": "linalg"})
+
+    assert first == second == {"calculus", "linalg"}
+    assert {id(tag) for tag in first} == {id(tag) for tag in second}
+
+
+def test_connector_get_note_blocks_keeps_document_order(tmp_path):
+    """Test type-filtered blocks come from the per-note index in document order."""
+    from mcp_server_learning.obsidian_connector import ObsidianConnector
+
+    (tmp_path / "Note.md").write_text(
+        "Intro\n\n```py\nx = 1\n```\n\n- item\n\nMiddle\n\n```sh\nls\n```\n"
+    )
+    connector = ObsidianConnector(str(tmp_path))
+    note = connector.get_note_by_name("Note")
+
+    blocks = connector.get_note_blocks(note, ["code", "paragraph", "code"])
+    assert [b["type"] for b in blocks] == ["paragraph", "code", "paragraph", "code"]
+    assert [b["content"] for b in connector.get_note_blocks(note, ["list"])] == ["- item"]
+    assert connector.get_note_blocks(note, ["quote"]) == []
+    assert connector.get_note_blocks(note) == note["blocks"]
@@ -11,17 +11,40 @@ Tests cover:
 - Expression simplification
 """
 
+import time
+from unittest.mock import patch
+
 import pytest
 import sympy as sp
 from sympy import E, cos, exp, log, pi, sin, symbols
 
+from mcp_server_learning import fastmcp_math_verification_server as math_server
 from mcp_server_learning.fastmcp_math_verification_server import (
     LaTeXParser,
     ProofStepValidator,
     SymPyVerifier,
+    _cdiff,
+    _cexpand,
+    _cfactor,
+    _check_equality,
+    _cintegrate,
+    _csimplify,
+    _parse_cached,
 )
 
 
+@pytest.fixture(autouse=True)
+def parse_cache_path(tmp_path, monkeypatch):
+    """Keep the persisted LaTeX parse cache out of the user's cache directory."""
+    path = tmp_path / "latex-parse.json"
+    # Spawned proof workers re-import the server and read the location from the env
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(math_server, "_PARSE_CACHE_PATH", path)
+    monkeypatch.setattr(math_server, "_parse_disk_cache", None)
+    monkeypatch.setattr(math_server, "_parse_disk_cache_dirty", False)
+    return path
+
+
 class TestLaTeXParser:
     """Test LaTeX parsing functionality."""
 
@@ -60,6 +83,45 @@ class TestLaTeXParser:
         expected = x**2 + 1
         assert sp.simplify(result - expected) == 0
 
+    def test_parse_cache_keys_on_cleaned_latex(self):
+        """Test delimited, bare and re-spaced forms of an expression share a cache entry."""
+        _parse_cached.cache_clear()
+        LaTeXParser.parse("$x^2 + 5$")
+        LaTeXParser.parse("x^2 + 5")
+        LaTeXParser.parse("  $ x^2  +\n5 $ ")
+        assert _parse_cached.cache_info().hits == 2
+
+    def test_parse_mixed_bare_and_latex_functions(self):
+        """Test bare function names are rewritten next to existing LaTeX commands."""
+        x = symbols("x")
+        result = LaTeXParser.parse(r"\sin(x) + cos(x)")
+        assert sp.simplify(result - (sin(x) + cos(x))) == 0
+
+    def test_parse_results_persist_across_restarts(self, monkeypatch, tmp_path):
+        """Test parse results saved to disk are reused by a fresh process state."""
+        _parse_cached.cache_clear()
+
+        first = LaTeXParser.parse(r"\frac{y^2}{7}")
+        math_server._save_parse_cache()
+
+        # Simulate a restart, with the LaTeX backends unable to parse anything
+        monkeypatch.setattr(math_server, "_parse_disk_cache", None)
+        _parse_cached.cache_clear()
+        monkeypatch.setattr(
+            math_server, "_parse_uncached", lambda latex: pytest.fail("parsed again")
+        )
+
+        assert sp.srepr(LaTeXParser.parse(r"\frac{y^2}{7}")) == sp.srepr(first)
+        _parse_cached.cache_clear()
+
+    def test_parse_is_cached(self):
+        """Test repeated parses of the same string are served from the cache."""
+        _parse_cached.cache_clear()
+        first = LaTeXParser.parse(r"\frac{x^3}{3}")
+        second = LaTeXParser.parse(r"\frac{x^3}{3}")
+        assert first == second
+        assert _parse_cached.cache_info().hits == 1
+
 
 class TestSymPyVerifier:
     """Test SymPy verification functionality."""
@@ -107,6 +169,119 @@ class TestSymPyVerifier:
 
         assert result["is_valid"] == False
 
+    def test_verify_equality_skips_simplify_when_expansion_suffices(self):
+        """Test equality that holds after expansion never reaches simplify."""
+        x = symbols("x")
+        _csimplify.cache_clear()
+
+        result = SymPyVerifier.verify_equality(x**2 + 2 * x + 1, (x + 1) ** 2)
+
+        assert result["is_valid"] is True
+        assert result["difference"] == "0"
+        assert _csimplify.cache_info().misses == 0
+
+    def test_verify_equality_decides_constants_without_simplify(self):
+        """Test exact constant expressions are decided without full simplify."""
+        _check_equality.cache_clear()
+        _csimplify.cache_clear()
+
+        assert SymPyVerifier.verify_equality(log(8), 3 * log(2))["is_valid"] is True
+        result = SymPyVerifier.verify_equality(log(8), 2 * log(2))
+        assert result["is_valid"] is False
+        assert result["difference"] == str(log(8) - 2 * log(2))
+        assert _csimplify.cache_info().misses == 0
+
+    def test_verify_equality_is_exact_for_close_constants(self):
+        """Test nearly equal exact constants are not matched within a tolerance."""
+        from mcp_server_learning.fastmcp_math_verification_server import verify_equivalence
+
+        result = verify_equivalence.fn("10^{20}", "10^{20}+1")["data"]
+        assert result["is_valid"] is False
+        assert result["difference"] == "-1"
+
+        result = verify_equivalence.fn(r"\pi", "3.14159265358979")["data"]
+        assert result["is_valid"] is False
+        assert result["difference"] != "0"
+
+    def test_verify_equality_floats_report_actual_difference(self):
+        """Test floating-point constants match within tolerance but keep their difference."""
+        is_equal, difference = _check_equality(sp.Float(0.1) + sp.Float(0.2), sp.Float(0.3))
+
+        assert is_equal is True
+        assert difference != "0"
+
+    def test_verify_limit_is_exact_for_large_integers(self):
+        """Test large integer limits are compared exactly."""
+        result = SymPyVerifier.verify_limit("x", "x", 10**15, "10^{15}+1")
+
+        assert result["is_valid"] is False
+        assert result["difference"] == "-1"
+
+    def test_verify_equality_reuses_cached_verdict(self):
+        """Test re-checking the same pair is answered from the equality cache."""
+        x = symbols("x")
+        _check_equality.cache_clear()
+
+        first = SymPyVerifier.verify_equality(sin(x) ** 2 + cos(x) ** 2, x)
+        second = SymPyVerifier.verify_equality(sin(x) ** 2 + cos(x) ** 2, x)
+
+        assert first == second
+        assert first["is_valid"] is False
+        assert _check_equality.cache_info().hits == 1
+
+    def test_result_strings_are_printed_once(self):
+        """Test repeated checks reuse the printed form of each expression."""
+        x = symbols("x")
+        math_server._print_cached.cache_clear()
+
+        first = SymPyVerifier.verify_derivative(x**3, "x", x**2)
+        misses = math_server._print_cached.cache_info().misses
+        second = SymPyVerifier.verify_derivative(x**3, "x", x**2)
+
+        assert first == second
+        assert first["explanation"] == f"Derivative differs by: {first['difference']}"
+        assert math_server._print_cached.cache_info().misses == misses
+
+    def test_verify_indefinite_integral_skips_integration_when_correct(self):
+        """Test a correct antiderivative is verified by differentiation alone."""
+        x = symbols("x")
+        _cintegrate.cache_clear()
+
+        result = SymPyVerifier.verify_integral(x * cos(x), "x", x * sin(x) + cos(x) + 5)
+
+        assert result["is_valid"] is True
+        assert _cintegrate.cache_info().misses == 0
+
+        wrong = SymPyVerifier.verify_integral(x * cos(x), "x", x * sin(x))
+        assert wrong["is_valid"] is False
+        assert wrong["computed_integral"] == str(x * sin(x) + cos(x))
+
+    def test_wrong_polynomial_answers_skip_simplify(self):
+        """Test a nonzero polynomial difference is reported without simplify."""
+        x, y = symbols("x y")
+        _csimplify.cache_clear()
+
+        derivative = SymPyVerifier.verify_derivative(x**3 * y, "x", 3 * x**2)
+        integral = SymPyVerifier.verify_integral(x**2, "x", x**3)
+
+        assert derivative["is_valid"] is False
+        assert derivative["difference"] == str(3 * x**2 * y - 3 * x**2)
+        assert integral["is_valid"] is False
+        assert _csimplify.cache_info().misses == 0
+
+    def test_verify_derivative_reuses_cached_results(self):
+        """Test repeated verifications reuse the cached derivative."""
+        x = symbols("x")
+        _cdiff.cache_clear()
+        _csimplify.cache_clear()
+
+        first = SymPyVerifier.verify_derivative(x**3 * sin(x), "x", 3 * x**2 * sin(x))
+        second = SymPyVerifier.verify_derivative(x**3 * sin(x), "x", 3 * x**2 * sin(x))
+
+        assert first == second
+        assert _cdiff.cache_info().hits == 1
+        assert _cdiff.cache_info().misses == 1
+
     def test_verify_integral_power_rule(self):
         """Test verifying integral with power rule."""
         verifier = SymPyVerifier()
@@ -146,6 +321,48 @@ class TestSymPyVerifier:
 
         assert result["is_valid"] == True
 
+    def test_invalid_numeric_settings_fall_back_to_defaults(self, monkeypatch):
+        """Test malformed numeric environment settings are ignored, not raised at import."""
+        monkeypatch.setenv("MCP_PROOF_WORKERS", "four")
+        assert math_server._env_number("MCP_PROOF_WORKERS", 1, int) == 1
+        monkeypatch.setenv("MCP_PROOF_WORKERS", "3")
+        assert math_server._env_number("MCP_PROOF_WORKERS", 1, int) == 3
+        monkeypatch.delenv("MCP_PROOF_WORKERS")
+        assert math_server._env_number("MCP_PROOF_WORKERS", 1, int) == 1
+
+    def test_simplify_timeout_is_reported(self, monkeypatch):
+        """Test a simplify call that exceeds its budget is interrupted and reported."""
+        x = symbols("x")
+        monkeypatch.setattr(math_server, "simplify", lambda expr: time.sleep(5) or expr)
+        monkeypatch.setattr(math_server, "_SIMPLIFY_TIMEOUT", 0.05)
+        _csimplify.cache_clear()
+
+        started = time.monotonic()
+        result = SymPyVerifier.verify_equality(sp.gamma(x + 1) - x * sp.gamma(x), 0)
+        simplified = SymPyVerifier.simplify_expression(sp.gamma(x + 1) / sp.gamma(x))
+
+        assert time.monotonic() - started < 2
+        assert result["is_valid"] is False
+        assert "timed out" in result["explanation"]
+        assert "timed out" in simplified["explanation"]
+        assert _csimplify.cache_info().currsize == 0
+
+    def test_verify_numeric_results_skip_simplify(self):
+        """Test constant limit and definite-integral results are compared numerically."""
+        x = symbols("x")
+        _csimplify.cache_clear()
+
+        wrong_limit = SymPyVerifier.verify_limit(sin(x) / x, "x", 0, 2)
+        definite = SymPyVerifier.verify_integral(
+            sp.exp(x), "x", E - 1, definite=True, limits=(0, 1)
+        )
+        infinite = SymPyVerifier.verify_limit(x**2, "x", "oo", sp.oo)
+
+        assert wrong_limit["is_valid"] is False
+        assert definite["is_valid"] is True
+        assert infinite["is_valid"] is True
+        assert _csimplify.cache_info().misses == 0
+
     def test_simplify_expression_factoring(self):
         """Test expression simplification with factoring."""
         verifier = SymPyVerifier()
@@ -166,10 +383,55 @@ class TestSymPyVerifier:
         x = symbols("x")
         assert sp.simplify(simplified_expr - (x + 1)) == 0
 
+    def test_simplify_expression_skips_passes_without_sums(self):
+        """Test atoms return immediately and sum-free products skip expand/factor."""
+        x = symbols("x")
+        _cexpand.cache_clear()
+        _cfactor.cache_clear()
+
+        atom = SymPyVerifier.simplify_expression(x)
+        product = SymPyVerifier.simplify_expression(sp.tan(x) * cos(x))
+
+        assert [step["step"] for step in atom["steps"]] == ["Original"]
+        assert product["simplified"] == "sin(x)"
+        assert _cexpand.cache_info().misses == 0
+        assert _cfactor.cache_info().misses == 0
+
+    def test_simplify_expression_cancels_only_quotients(self):
+        """Test the cancel pass runs only for expressions with a denominator."""
+        x = symbols("x")
+        math_server._ccancel.cache_clear()
+
+        SymPyVerifier.simplify_expression((x + 1) ** 2)
+        assert math_server._ccancel.cache_info().misses == 0
+
+        result = SymPyVerifier.simplify_expression((x**2 - 1) / (x - 1) + x)
+        assert result["simplified"] == "2*x + 1"
+        assert math_server._ccancel.cache_info().misses == 1
+
+    def test_simplify_expression_reports_common_subexpressions(self):
+        """Test repeated subexpressions are factored out before simplifying."""
+        x = symbols("x")
+        expr = sin(x + 1) ** 2 + cos(x + 1) ** 2 + (x + 1) ** 3
+
+        result = SymPyVerifier.simplify_expression(expr)
+
+        step_names = [step["step"] for step in result["steps"]]
+        assert "Common subexpressions" in step_names
+        assert sp.sympify(result["simplified"]) == (x + 1) ** 3 + 1
+
 
 class TestProofStepValidator:
     """Test multi-step proof validation."""
 
+    def test_justification_operation(self):
+        """Test justifications are classified by their calculus keywords."""
+        classify = math_server._justification_operation
+        assert classify("Differentiate with respect to t") == "derivative"
+        assert classify("Take the integral") == "integral"
+        assert classify("Integrate the derivative") == "derivative"
+        assert classify("Expand the square") is None
+
     def test_validate_simple_proof(self):
         """Test validating a simple two-step proof."""
         validator = ProofStepValidator()
@@ -189,6 +451,71 @@ class TestProofStepValidator:
         assert result["total_steps"] == 2
         assert result["valid_steps"] == 2
 
+    def test_validate_proof_parses_each_expression_once(self):
+        """Test repeated expressions across steps are parsed a single time."""
+        validator = ProofStepValidator()
+        steps = [
+            {
+                "expression": "x^2 - 1",
+                "result": "(x-1)(x+1)",
+                "justification": "Factoring difference of squares",
+            },
+            {"expression": "(x-1)(x+1)", "result": "x^2 - 1", "justification": "Expanding"},
+        ]
+
+        with patch.object(LaTeXParser, "parse", wraps=LaTeXParser.parse) as mock_parse:
+            result = validator.validate_proof(steps)
+
+        assert result["all_steps_valid"] == True
+        assert mock_parse.call_count == 2
+
+    def test_validate_long_proof_in_parallel_matches_serial(self, monkeypatch):
+        """Test long proofs validated in worker processes give the serial results."""
+        steps = [
+            {"expression": "x^3", "result": "x^3", "justification": "Starting expression"},
+            {"expression": "3x^2", "justification": "Differentiate with respect to x"},
+            {"expression": "6x", "justification": "Differentiate with respect to x"},
+            {"expression": "3x^2 + 1", "justification": "Integrate with respect to x"},
+            {"expression": "2x", "justification": "Differentiate with respect to x"},
+        ]
+        monkeypatch.setattr(math_server, "_PROOF_WORKERS", 2)
+        parallel = ProofStepValidator().validate_proof(steps)
+
+        monkeypatch.setattr(math_server, "_PROOF_WORKERS", 1)
+        serial = ProofStepValidator().validate_proof(steps)
+
+        assert parallel == serial
+        assert parallel["all_steps_valid"] is False
+        assert [s.get("transition_valid") for s in parallel["steps"]] == [
+            None,
+            True,
+            True,
+            True,
+            False,
+        ]
+
+    def test_validate_proof_fail_fast_skips_later_steps(self):
+        """Test fail_fast stops at the first invalid step and marks the rest skipped."""
+        steps = [
+            {"expression": "x^2", "justification": "Starting expression"},
+            {"expression": "x", "justification": "Differentiate with respect to x"},
+            {"expression": "1", "justification": "Differentiate with respect to x"},
+        ]
+
+        result = ProofStepValidator().validate_proof(steps, fail_fast=True)
+
+        assert result["all_steps_valid"] is False
+        assert result["total_steps"] == 3
+        assert result["valid_steps"] == 2
+        assert result["steps"][1]["transition_valid"] is False
+        assert result["steps"][2] == {
+            "step_number": 3,
+            "expression": "1",
+            "is_valid": None,
+            "skipped": True,
+            "explanation": "Skipped after an earlier invalid step",
+        }
+
     def test_validate_proof_with_derivative(self):
         """Test validating proof involving derivatives."""
         validator = ProofStepValidator()
@@ -379,6 +706,18 @@ class TestEdgeCases:
 class TestMCPToolFunctions:
     """Test the MCP tool functions for mathematical verification."""
 
+    def test_clear_caches_tool(self):
+        """Test clear_caches empties the parse cache and reports counts."""
+        from mcp_server_learning.fastmcp_math_verification_server import clear_caches
+
+        LaTeXParser.parse("x^2 + 3")
+        result = clear_caches.fn()
+
+        assert result["success"] is True
+        assert result["data"]["cleared"]["parse"] >= 1
+        assert _parse_cached.cache_info().currsize == 0
+        assert "sympy" in result["data"]["cleared"]
+
     def test_verify_equivalence_tool(self):
         """Test verify_equivalence tool with equal expressions."""
         from mcp_server_learning.fastmcp_math_verification_server import verify_equivalence
@@ -478,6 +817,73 @@ class TestMCPToolFunctions:
         assert result["data"]["is_identity"] is True
         assert "holds" in result["message"].lower()
 
+    def test_check_identity_uses_cheap_canonicalizers(self):
+        """Test trig and rational identities are settled without full simplify."""
+        from mcp_server_learning.fastmcp_math_verification_server import check_identity
+
+        _csimplify.cache_clear()
+
+        assert check_identity.fn(r"\tan(x) \cos(x) - \sin(x)")["data"]["is_identity"] is True
+        assert check_identity.fn(r"\frac{x^2 - 1}{x - 1} - x - 1")["data"]["is_identity"] is True
+        assert _csimplify.cache_info().misses == 0
+
+    def test_check_identity_rejects_non_identities_without_simplify(self):
+        """Test a nonzero value at a sample point settles a non-identity."""
+        from mcp_server_learning.fastmcp_math_verification_server import check_identity
+
+        _csimplify.cache_clear()
+
+        assert check_identity.fn(r"\frac{1}{x} - x")["data"]["is_identity"] is False
+        assert check_identity.fn(r"\sin(x)^2 - \cos(x)^2")["data"]["is_identity"] is False
+        assert _csimplify.cache_info().misses == 0
+
+    def test_numeric_probe_uses_distinct_values_per_symbol(self):
+        """Test differences between symbols are screened out without simplify."""
+        from mcp_server_learning.fastmcp_math_verification_server import check_identity
+
+        _csimplify.cache_clear()
+
+        assert check_identity.fn("x - y")["data"]["is_identity"] is False
+        assert check_identity.fn(r"\sin(x) - \sin(y)")["data"]["is_identity"] is False
+        assert _csimplify.cache_info().misses == 0
+
+    def test_unevaluated_zero_sums_are_zero(self):
+        """Test parser-built sums such as x - x are recognised as zero by every tool."""
+        from mcp_server_learning.fastmcp_math_verification_server import (
+            check_identity,
+            verify_equivalence,
+            verify_proof,
+        )
+
+        result = verify_equivalence.fn("x - x", "0")
+        assert result["data"]["is_valid"] is True
+        assert result["data"]["simplified_difference"] == "0"
+
+        assert check_identity.fn("x - x")["data"]["is_identity"] is True
+        assert check_identity.fn("x + y - y - x")["data"]["is_identity"] is True
+
+        steps = [
+            {"expression": "x - x", "justification": "Start"},
+            {"expression": "0", "justification": "Cancel terms"},
+        ]
+        assert verify_proof.fn(steps)["data"]["all_steps_valid"] is True
+
+    def test_check_identity_test_values(self):
+        """Test identities are evaluated at the given points with a compiled function."""
+        from mcp_server_learning.fastmcp_math_verification_server import check_identity
+
+        math_server._clambdify.cache_clear()
+
+        result = check_identity.fn("x^2 - 1", test_values=[1.0, 2.0])
+        assert [r["holds"] for r in result["data"]["test_results"]] == [True, False]
+        assert result["data"]["test_results"][1]["result"] == 3.0
+
+        check_identity.fn("x^2 - 1", test_values=[-1.0])
+        assert math_server._clambdify.cache_info().hits == 1
+
+        result = check_identity.fn(r"\ln(x)", test_values=[-1.0])
+        assert "error" in result["data"]["test_results"][0]
+
     def test_check_identity_not_identity(self):
         """Test check_identity tool with non-identity."""
         from mcp_server_learning.fastmcp_math_verification_server import check_identity
@@ -528,6 +934,21 @@ class TestMCPToolFunctions:
         assert result["success"] is True
         assert result["data"]["definite"] is True
 
+    def test_verify_integral_numeric_and_infinite_limits(self):
+        """Test plain-number and infinite limits are parsed without the LaTeX parser."""
+        from mcp_server_learning.fastmcp_math_verification_server import verify_integral
+
+        assert math_server._parse_bound("-2.5") == sp.Rational(-5, 2)
+        assert math_server._parse_bound("inf") == sp.oo
+
+        with patch.object(LaTeXParser, "parse", wraps=LaTeXParser.parse) as parse:
+            result = verify_integral.fn(
+                "e^{-x}", "x", "1", is_definite=True, lower_limit="0", upper_limit="oo"
+            )
+
+        assert result["data"]["is_valid"] is True
+        assert parse.call_count == 2
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])